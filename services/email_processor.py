@@ -107,6 +107,10 @@ class EmailProcessor:
         self.scheduler = BackgroundScheduler(timezone=pytz.UTC)
         self._lock = threading.Lock()
         
+        # Incremented (under _lock) whenever anything get_status() reports changes,
+        # so callers can reuse a status they already rendered
+        self.state_version = 0
+        
         # Configuration
         self.config = get_config()
         self.processing_intervals = {
@@ -138,7 +142,8 @@ class EmailProcessor:
             if self.state != ServiceState.STOPPED:
                 self.logger.warning(f"Cannot start service in state {self.state}")
                 return False
-                
+            
+            self.state_version += 1
             try:
                 self.state = ServiceState.STARTING
                 self.mode = mode
@@ -183,7 +188,8 @@ class EmailProcessor:
         with self._lock:
             if self.state in [ServiceState.STOPPED, ServiceState.STOPPING]:
                 return True
-                
+            
+            self.state_version += 1
             try:
                 self.state = ServiceState.STOPPING
                 self.logger.info("Stopping email processing service")
@@ -232,7 +238,8 @@ class EmailProcessor:
             if self.state not in [ServiceState.RUNNING_STARTUP, ServiceState.RUNNING_MAINTENANCE]:
                 self.logger.warning(f"Cannot switch mode in state {self.state}")
                 return False
-                
+            
+            self.state_version += 1
             try:
                 old_mode = self.mode
                 self.logger.info(f"Switching from {old_mode.value} to {new_mode.value} mode")
@@ -536,7 +543,7 @@ class EmailProcessor:
             processing_time = time.time() - start_time
             self._update_stats(result, processing_time)
             
-            self.consecutive_errors = 0
+            self._reset_error_count()
             self.logger.info(f"Startup inbox processing completed in {processing_time:.2f}s (processed {result.get('mail_list count', 0)} messages)")
             
         except Exception as e:
@@ -580,7 +587,7 @@ class EmailProcessor:
             self._update_stats(inbox_result, processing_time)
             
             # Reset error counter on successful processing
-            self.consecutive_errors = 0
+            self._reset_error_count()
             
             # Combine results
             combined_result = {
@@ -663,7 +670,7 @@ class EmailProcessor:
             processing_time = time.time() - start_time
             self._update_stats(result, processing_time)
             
-            self.consecutive_errors = 0
+            self._reset_error_count()
             self.logger.debug(f"Maintenance inbox processing completed in {processing_time:.2f}s (processed {result.get('mail_list count', 0)} messages)")
             
         except Exception as e:
@@ -694,6 +701,7 @@ class EmailProcessor:
     def _update_stats(self, result: Dict[str, Any], processing_time: float):
         """Update processing statistics"""
         with self._lock:
+            self.state_version += 1
             self.stats.last_run = datetime.now()
             
             # Update processing time average
@@ -717,17 +725,28 @@ class EmailProcessor:
                 # Old format from process_inbox
                 self.stats.emails_pending = len(result['uids in pending'])
     
+    def _reset_error_count(self):
+        """Clear the consecutive error count after a successful run"""
+        if self.consecutive_errors:
+            with self._lock:
+                self.consecutive_errors = 0
+                self.state_version += 1
+    
     def _handle_processing_error(self, error: Exception, operation: str):
         """Handle processing errors with consecutive error tracking"""
-        self.consecutive_errors += 1
-        self.stats.error_count += 1
-        self.last_error = str(error)
+        with self._lock:
+            self.consecutive_errors += 1
+            self.stats.error_count += 1
+            self.last_error = str(error)
+            self.state_version += 1
         
         self.logger.error(f"Error in {operation}: {error}")
         
         if self.consecutive_errors >= self.max_consecutive_errors:
             self.logger.critical(f"Too many consecutive errors ({self.consecutive_errors}), stopping service")
-            self.state = ServiceState.ERROR
+            with self._lock:
+                self.state = ServiceState.ERROR
+                self.state_version += 1
             self.stop()
     
     def should_transition_to_maintenance(self) -> bool:
@@ -49,6 +49,8 @@ class TaskManager:
         self.processors: Dict[str, EmailProcessor] = {}
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self._lock = threading.Lock()
+        # Separate lock for task_history: _log_task is called while _lock is held
+        self._history_lock = threading.Lock()
         self._initialized = False  # Track initialization state
         
         # Configuration
@@ -59,6 +61,7 @@ class TaskManager:
         self.startup_time = datetime.now()
         self.task_history: List[Dict[str, Any]] = []
         self.max_history_size = 1000
+        self.history_version = 0  # Incremented whenever task_history changes
         
         # Auto-transition monitoring
         self.transition_check_interval = 3600  # Check every hour
@@ -249,6 +252,26 @@ class TaskManager:
         
         return processor.get_status()
     
+    def account_count(self) -> int:
+        """
+        Get the number of accounts being managed
+        
+        Returns:
+            int: Number of registered accounts
+        """
+        with self._lock:
+            return len(self.processors)
+    
+    def account_emails(self) -> List[str]:
+        """
+        Get the emails of the accounts being managed
+        
+        Returns:
+            list: Registered account emails
+        """
+        with self._lock:
+            return list(self.processors)
+    
     def get_all_status(self) -> Dict[str, Any]:
         """
         Get status for all accounts and task manager
@@ -357,6 +380,32 @@ class TaskManager:
                 'error_rate': total_errors / max(1, total_processed)
             }
     
+    def get_snapshot(self, history_limit: int = 10) -> Dict[str, Any]:
+        """
+        Get aggregate stats, full status and recent history in one call
+        
+        Lets callers that need all three (e.g. the dashboard) collect them
+        once per request instead of once per consumer.
+        
+        Args:
+            history_limit: Maximum number of task history entries to include
+            
+        Returns:
+            dict: Snapshot with 'aggregate', 'all_status', 'task_history' and
+                'history_version' keys
+        """
+        aggregate = self.get_aggregate_stats()
+        all_status = self.get_all_status()
+        with self._history_lock:
+            history_version = self.history_version
+            task_history = self.task_history[-history_limit:]
+        return {
+            'aggregate': aggregate,
+            'all_status': all_status,
+            'history_version': history_version,
+            'task_history': task_history
+        }
+    
     def start_all(self) -> Dict[str, bool]:
         """
         Start processing for all accounts
@@ -424,11 +473,13 @@ class TaskManager:
             'details': details
         }
         
-        self.task_history.append(task_entry)
-        
-        # Trim history if too large
-        if len(self.task_history) > self.max_history_size:
-            self.task_history = self.task_history[-self.max_history_size:]
+        with self._history_lock:
+            self.task_history.append(task_entry)
+            self.history_version += 1
+            
+            # Trim history if too large
+            if len(self.task_history) > self.max_history_size:
+                self.task_history = self.task_history[-self.max_history_size:]
     
     def _check_auto_transitions(self):
         """Check for accounts ready for auto-transition to maintenance mode"""
@@ -529,7 +580,7 @@ class TaskManager:
         Returns:
             list: Recent task history entries
         """
-        with self._lock:
+        with self._history_lock:
             return self.task_history[-limit:] if self.task_history else []
     
     def is_initialized(self) -> bool:
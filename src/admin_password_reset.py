@@ -25,9 +25,11 @@ from pathlib import Path
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from security import SecurityManager, SecureConfig
+from security import (
+    SecurityManager, SecureConfig, write_secure_file,
+    format_admin_credentials, parse_admin_credentials
+)
 from config import get_config
-import bcrypt
 
 
 def main():
@@ -48,8 +50,7 @@ def main():
     
     try:
         # Read current admin data
-        admin_data = admin_file.read_text().strip()
-        current_username, _ = admin_data.split(':', 1)
+        current_username, _ = parse_admin_credentials(admin_file.read_text())
         
         print(f"📋 Current admin username: {current_username}")
         print()
@@ -88,9 +89,8 @@ def main():
         hashed_password = security_manager.hash_user_password(new_password)
         
         # Update admin file
-        new_admin_data = f"{current_username}:{hashed_password}"
-        admin_file.write_text(new_admin_data)
-        admin_file.chmod(0o600)
+        new_admin_data = format_admin_credentials(current_username, hashed_password)
+        write_secure_file(admin_file, new_admin_data)
         
         print("✅ Password reset successfully!")
         print(f"   Username: {current_username}")
@@ -110,11 +110,13 @@ def main():
 def cleanup_reset_tokens(config):
     """Clean up any existing reset tokens"""
     try:
+        # Tokens are removed unconditionally after a reset, so there is no
+        # need to read or decrypt them first - unlinking is enough.
         token_files = list(config.config_dir.glob('.reset_token_*'))
         if token_files:
             print("🧹 Cleaning up old reset tokens...")
             for token_file in token_files:
-                token_file.unlink()
+                token_file.unlink(missing_ok=True)
             print(f"   Removed {len(token_files)} old token(s).")
     except Exception as e:
         print(f"⚠️  Warning: Could not clean up reset tokens: {e}")
@@ -19,6 +19,29 @@ from pathlib import Path
 import json
 
 
+# List file entry counts keyed by path: (mtime_ns, size, count)
+_list_entry_counts: Dict[str, tuple] = {}
+
+
+def count_list_entries(list_path) -> int:
+    """
+    Count the non-blank entries in a list file without materializing them
+    
+    Counts are memoized on the file's mtime and size, so unchanged lists
+    cost a single stat() call.
+    """
+    key = str(list_path)
+    st = os.stat(key)
+    cached = _list_entry_counts.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    
+    with open(key, 'rb') as f:
+        count = sum(1 for line in f if line.strip())
+    _list_entry_counts[key] = (st.st_mtime_ns, st.st_size, count)
+    return count
+
+
 @dataclass
 class AccountConfig:
     """Configuration for a single email account"""
@@ -83,6 +106,7 @@ class Config:
         
         # Load configuration
         self.accounts: List[AccountConfig] = []
+        self._accounts_by_email = None  # (id(accounts), len(accounts), {email: account})
         self.timezone = "US/Pacific"
         self.processing_intervals = {
             'inbox': 5,
@@ -212,8 +236,7 @@ class Config:
             entry_count = 0
             if list_path.exists():
                 try:
-                    with open(list_path, 'r') as f:
-                        entry_count = len([line.strip() for line in f.readlines() if line.strip()])
+                    entry_count = count_list_entries(list_path)
                 except Exception:
                     entry_count = 0
             
@@ -247,6 +270,26 @@ class Config:
                 return account
         return None
     
+    def get_account_by_email(self, email: str) -> Optional[AccountConfig]:
+        """
+        Get account configuration by email address
+        
+        Uses an email -> account index that is rebuilt when the accounts list
+        is replaced or resized, when a hit no longer matches (account edited
+        in place) and on a miss, so lookups never return stale results.
+        """
+        index = self._accounts_by_email
+        if index is not None and index[0] == id(self.accounts) and index[1] == len(self.accounts):
+            account = index[2].get(email)
+            if account is not None and account.email == email:
+                return account
+        
+        by_email = {}
+        for account in self.accounts:
+            by_email.setdefault(account.email, account)
+        self._accounts_by_email = (id(self.accounts), len(self.accounts), by_email)
+        return by_email.get(email)
+    
     def get_retention_setting(self, folder_type: str) -> int:
         """Get retention setting for a folder type (in days)"""
         return self.retention_settings.get(folder_type, 30)  # Default 30 days
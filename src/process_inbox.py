@@ -147,11 +147,7 @@ def process_inbox(account, folder="INBOX", limit=100):
     log["uids in vendorlist"] = vendorlist
     #  Move email using configured folder names
     config = get_config()
-    account_config = None
-    for acc in config.accounts:
-        if acc.email == account.email:
-            account_config = acc
-            break
+    account_config = config.get_account_by_email(account.email)
     
     if account_config and hasattr(account_config, 'folders'):
         processed_folder = account_config.folders.get('processed', 'INBOX.Processed')
@@ -247,11 +243,7 @@ def process_inbox_maint(account, folder="INBOX", limit=500):
     log["uids in vendorlist"] = vendorlist
     #  Move email using configured folder names
     config = get_config()
-    account_config = None
-    for acc in config.accounts:
-        if acc.email == account.email:
-            account_config = acc
-            break
+    account_config = config.get_account_by_email(account.email)
     
     if account_config and hasattr(account_config, 'folders'):
         junk_folder = account_config.folders.get('junk', 'INBOX.Junk') 
@@ -314,10 +314,12 @@ class RulesEngine:
         else:
             self.rules_file = rules_file
         self.rules: List[EmailRule] = []
+        self._name_index: Optional[Dict[str, List[str]]] = None
         self.load_rules()
     
     def load_rules(self):
         """Load rules from the rules file"""
+        self._name_index = None
         if not self.rules_file.exists():
             self.rules = []
             return
@@ -415,6 +417,14 @@ class RulesEngine:
         """Add a new rule"""
         self.rules.append(rule)
         self.rules.sort(key=lambda r: r.priority)
+        self._name_index = None
+        self.save_rules()
+    
+    def add_rules(self, rules: List[EmailRule]):
+        """Add several rules, saving the rules file once"""
+        self.rules.extend(rules)
+        self.rules.sort(key=lambda r: r.priority)
+        self._name_index = None
         self.save_rules()
     
     def update_rule(self, rule_id: str, updated_rule: EmailRule):
@@ -423,6 +433,7 @@ class RulesEngine:
             if rule.id == rule_id:
                 self.rules[i] = updated_rule
                 self.rules.sort(key=lambda r: r.priority)
+                self._name_index = None
                 self.save_rules()
                 return True
         return False
@@ -430,6 +441,7 @@ class RulesEngine:
     def delete_rule(self, rule_id: str):
         """Delete a rule"""
         self.rules = [rule for rule in self.rules if rule.id != rule_id]
+        self._name_index = None
         self.save_rules()
     
     def get_rule(self, rule_id: str) -> Optional[EmailRule]:
@@ -439,6 +451,15 @@ class RulesEngine:
                 return rule
         return None
     
+    def get_rule_ids_by_name(self, name: str) -> List[str]:
+        """Get the IDs of rules with the given name (case-insensitive)"""
+        if self._name_index is None:
+            index: Dict[str, List[str]] = {}
+            for rule in self.rules:
+                index.setdefault(rule.name.lower(), []).append(rule.id)
+            self._name_index = index
+        return self._name_index.get(name.lower(), [])
+    
     def get_all_rules(self) -> List[EmailRule]:
         """Get all rules, sorted by priority"""
         return sorted(self.rules, key=lambda r: r.priority)
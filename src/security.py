@@ -24,11 +24,14 @@ Provides secure storage and handling of sensitive data including:
 import os
 import base64
 import secrets
+import tempfile
 from typing import Optional, Dict, Any
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import json
@@ -40,7 +43,7 @@ class SecureConfig:
     master_key_env_var: str = "MAIL_RULEZ_MASTER_KEY"
     master_key_file: str = ".master_key"
     session_secret_env_var: str = "MAIL_RULEZ_SESSION_SECRET"
-    password_salt_rounds: int = 12
+    password_salt_rounds: int = 12  # bcrypt cost; only used by legacy hashes
     session_timeout_hours: int = 24
     max_login_attempts: int = 5
     lockout_duration_minutes: int = 15
@@ -53,7 +56,10 @@ class SecurityManager:
         self.config = config or SecureConfig()
         self._fernet = None
         self._session_secret = None
+        self._password_hasher = PasswordHasher()  # Argon2id with RFC 9106 defaults
         self._failed_attempts: Dict[str, Dict] = {}
+        # Built up front so the first dummy verify costs the same as later ones
+        self._dummy_password_hash = self.hash_user_password(secrets.token_urlsafe(16))
     
     def _get_or_create_master_key(self) -> bytes:
         """Get master key from environment, file, or generate new one"""
@@ -114,7 +120,11 @@ class SecurityManager:
         return key
     
     def _get_fernet(self) -> Fernet:
-        """Get or create Fernet encryption instance"""
+        """Get or create Fernet encryption instance
+
+        The master key lookup and Fernet construction happen once per manager;
+        every encrypt/decrypt call reuses the cached instance.
+        """
         if self._fernet is None:
             key = self._get_or_create_master_key()
             self._fernet = Fernet(key)
@@ -147,15 +157,33 @@ class SecurityManager:
         return decrypted_bytes.decode()
     
     def hash_user_password(self, password: str) -> str:
-        """Hash a user password for authentication storage"""
-        salt = bcrypt.gensalt(rounds=self.config.password_salt_rounds)
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        """Hash a user password for authentication storage (Argon2id)"""
+        return self._password_hasher.hash(password)
     
     def verify_user_password(self, password: str, hashed_password: str) -> bool:
-        """Verify a user password against stored hash"""
+        """Verify a user password against stored hash (Argon2id or legacy bcrypt)"""
+        if hashed_password.startswith('$argon2'):
+            try:
+                return self._password_hasher.verify(hashed_password, password)
+            except (VerificationError, InvalidHashError):
+                return False
         return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
     
+    def password_needs_rehash(self, hashed_password: str) -> bool:
+        """Check if a stored hash should be upgraded to current Argon2id parameters"""
+        if not hashed_password.startswith('$argon2'):
+            return True
+        return self._password_hasher.check_needs_rehash(hashed_password)
+    
+    def verify_dummy_password(self, password: str) -> bool:
+        """Run a full password verify against a throwaway hash and fail
+
+        Used when there is no stored hash to check against, so the response
+        takes as long as a real verification and does not reveal that state.
+        """
+        self.verify_user_password(password, self._dummy_password_hash)
+        return False
+    
     def generate_session_token(self) -> str:
         """Generate a secure session token"""
         return secrets.token_urlsafe(32)
@@ -220,7 +248,8 @@ class SecurityManager:
     
     def secure_compare(self, a: str, b: str) -> bool:
         """Timing-safe string comparison"""
-        return secrets.compare_digest(a, b)
+        # Compare as bytes: compare_digest rejects non-ASCII str arguments
+        return secrets.compare_digest(a.encode('utf-8'), b.encode('utf-8'))
 
 
 class SessionManager:
@@ -320,6 +349,61 @@ class SecureAccountConfig:
         )
 
 
+ADMIN_CREDENTIALS_VERSION = 1
+
+
+def format_admin_credentials(username: str, password_hash: str) -> str:
+    """Serialize admin credentials for the admin user file"""
+    return json.dumps({'v': ADMIN_CREDENTIALS_VERSION, 'u': username, 'h': password_hash})
+
+
+def parse_admin_credentials(data: str) -> tuple:
+    """Parse admin user file contents into (username, password_hash)
+
+    Accepts the versioned JSON format as well as the legacy
+    ``username:hash`` format written by earlier releases.
+    """
+    data = data.strip()
+    if data.startswith('{'):
+        credentials = json.loads(data)
+        if credentials.get('v') != ADMIN_CREDENTIALS_VERSION:
+            raise ValueError(f"Unsupported admin credentials version: {credentials.get('v')}")
+        return credentials['u'], credentials['h']
+    
+    username, password_hash = data.split(':', 1)
+    return username, password_hash
+
+
+def write_secure_file(path, data: str):
+    """Atomically write data to path as an owner read/write only (0600) file
+
+    The data goes to a temporary file created with its final permissions in
+    the same directory, which is then renamed over path. Readers see either
+    the old or the new complete contents, and the data is never readable by
+    other users.
+    """
+    path = str(path)
+    directory, name = os.path.split(path)
+    
+    # mkstemp picks a unique name, so concurrent writers and stale temp
+    # files left by a crashed writer never collide
+    fd, tmp_path = tempfile.mkstemp(dir=directory or None, prefix=f".{name}.", suffix='.tmp')
+    try:
+        try:
+            os.fchmod(fd, 0o600)
+            os.write(fd, data.encode('utf-8'))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 # Global security manager instance
 _security_manager = None
 
@@ -20,7 +20,7 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from config import Config, AccountConfig, get_config, set_config
+from config import Config, AccountConfig, get_config, set_config, count_list_entries
 
 
 class TestAccountConfig:
@@ -91,7 +91,23 @@ class TestConfig:
             
             not_found = config.get_account("nonexistent")
             assert not_found is None
-    
+
+    def test_get_account_by_email(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config(base_dir=temp_dir)
+            account = config.add_account("test", "imap.example.com", "test@example.com", "password123")
+
+            assert config.get_account_by_email("test@example.com") is account
+            assert config.get_account_by_email("other@example.com") is None
+
+            # Index follows accounts added or edited after the first lookup
+            other = config.add_account("other", "imap.example.com", "other@example.com", "password123")
+            assert config.get_account_by_email("other@example.com") is other
+
+            account.email = "renamed@example.com"
+            assert config.get_account_by_email("test@example.com") is None
+            assert config.get_account_by_email("renamed@example.com") is account
+
     @patch.dict(os.environ, {
         'MAIL_RULEZ_SERVER': 'imap.test.com',
         'MAIL_RULEZ_EMAIL': 'env@test.com',
@@ -182,4 +198,29 @@ class TestGlobalConfig:
             set_config(custom_config)
             
             retrieved_config = get_config()
-            assert retrieved_config is custom_config
\ No newline at end of file
+            assert retrieved_config is custom_config
+
+
+class TestCountListEntries:
+    def test_counts_non_blank_lines(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            list_path = Path(temp_dir) / "white.txt"
+            list_path.write_text("a@example.com\n\nb@example.com\n   \nc@example.com")
+            
+            assert count_list_entries(list_path) == 3
+    
+    def test_empty_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            list_path = Path(temp_dir) / "white.txt"
+            list_path.touch()
+            
+            assert count_list_entries(list_path) == 0
+    
+    def test_count_refreshes_when_file_changes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            list_path = Path(temp_dir) / "white.txt"
+            list_path.write_text("a@example.com\n")
+            assert count_list_entries(list_path) == 1
+            
+            list_path.write_text("a@example.com\nb@example.com\n")
+            assert count_list_entries(list_path) == 2
@@ -22,7 +22,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from security import (
     SecurityManager, SessionManager, SecureAccountConfig, 
-    SecureConfig, get_security_manager, set_security_manager
+    SecureConfig, get_security_manager, set_security_manager, write_secure_file,
+    format_admin_credentials, parse_admin_credentials
 )
 from config import AccountConfig
 
@@ -41,6 +42,17 @@ class TestSecurityManager:
         decrypted = security.decrypt_password(encrypted)
         assert decrypted == password
     
+    def test_fernet_instance_is_reused(self):
+        security = SecurityManager()
+        
+        with patch.object(security, '_get_or_create_master_key',
+                          wraps=security._get_or_create_master_key) as get_key:
+            encrypted = security.encrypt_data("token")
+            security.decrypt_data(encrypted)
+            security.encrypt_password("password")
+        
+        assert get_key.call_count == 1
+    
     def test_different_passwords_encrypt_differently(self):
         security = SecurityManager()
         
@@ -67,6 +79,41 @@ class TestSecurityManager:
         # Wrong password should not verify
         assert not security.verify_user_password("wrong_password", hashed)
     
+    def test_user_password_hashing_uses_argon2id(self):
+        security = SecurityManager()
+        
+        hashed = security.hash_user_password("user_password_123")
+        
+        assert hashed.startswith("$argon2id$")
+        assert not security.password_needs_rehash(hashed)
+    
+    def test_legacy_bcrypt_hash_verifies_and_needs_rehash(self):
+        import bcrypt
+        security = SecurityManager()
+        
+        legacy_hash = bcrypt.hashpw(b"user_password_123", bcrypt.gensalt(rounds=4)).decode('utf-8')
+        
+        assert security.verify_user_password("user_password_123", legacy_hash)
+        assert not security.verify_user_password("wrong_password", legacy_hash)
+        assert security.password_needs_rehash(legacy_hash)
+    
+    def test_verify_dummy_password(self):
+        security = SecurityManager()
+        
+        # The dummy hash exists before the first verify, so it is not timed
+        dummy_hash = security._dummy_password_hash
+        assert dummy_hash
+        
+        with patch.object(security, 'verify_user_password',
+                          wraps=security.verify_user_password) as verify:
+            assert security.verify_dummy_password("anything") is False
+            assert security.verify_dummy_password("anything") is False
+        
+        # A real verification runs every time, against a hash built once
+        assert verify.call_count == 2
+        assert verify.call_args_list[0][0][1] == dummy_hash
+        assert verify.call_args_list[1][0][1] == dummy_hash
+    
     def test_session_token_generation(self):
         security = SecurityManager()
         
@@ -114,6 +161,10 @@ class TestSecurityManager:
         # Should handle empty strings
         assert security.secure_compare("", "")
         assert not security.secure_compare("", "test")
+        
+        # Should handle non-ASCII strings
+        assert security.secure_compare("admïn", "admïn")
+        assert not security.secure_compare("admïn", "admin")
     
     @patch.dict(os.environ, {'MAIL_RULEZ_MASTER_KEY': 'MFZ0Wi1DdmNLdG5ncTVlOGpLSmlEV205TmRLRFB0VFdnTDcxN3h4bXdhdz0='})
     def test_master_key_from_environment(self):
@@ -308,4 +359,87 @@ class TestSecureConfig:
         
         assert config.master_key_env_var == "CUSTOM_KEY"
         assert config.session_timeout_hours == 8
-        assert config.max_login_attempts == 3
\ No newline at end of file
+        assert config.max_login_attempts == 3
+
+
+class TestWriteSecureFile:
+    def test_creates_owner_only_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, '.admin_user')
+            write_secure_file(path, 'admin:hash')
+            
+            with open(path) as f:
+                assert f.read() == 'admin:hash'
+            assert os.stat(path).st_mode & 0o777 == 0o600
+    
+    def test_overwrites_existing_contents(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, '.admin_user')
+            write_secure_file(path, 'admin:a_much_longer_hash_value')
+            write_secure_file(path, 'admin:short')
+            
+            with open(path) as f:
+                assert f.read() == 'admin:short'
+    
+    def test_replaces_file_without_leaving_temp_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, '.admin_user')
+            with open(path, 'w') as f:
+                f.write('old')
+            os.chmod(path, 0o644)
+            
+            write_secure_file(path, 'new')
+            
+            with open(path) as f:
+                assert f.read() == 'new'
+            assert os.stat(path).st_mode & 0o777 == 0o600
+            assert os.listdir(temp_dir) == ['.admin_user']
+    
+    def test_ignores_stale_temp_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, '.admin_user')
+            stale = os.path.join(temp_dir, f'..admin_user.{os.getpid()}.tmp')
+            with open(stale, 'w') as f:
+                f.write('stale')
+            
+            write_secure_file(path, 'new')
+            
+            with open(path) as f:
+                assert f.read() == 'new'
+    
+    def test_concurrent_writers(self):
+        import threading
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, '.admin_user')
+            errors = []
+            
+            def write(value):
+                try:
+                    write_secure_file(path, value)
+                except Exception as e:
+                    errors.append(e)
+            
+            threads = [threading.Thread(target=write, args=(f'admin:{i}',)) for i in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            
+            assert errors == []
+            assert os.listdir(temp_dir) == ['.admin_user']
+            assert os.stat(path).st_mode & 0o777 == 0o600
+
+
+class TestAdminCredentials:
+    def test_round_trip(self):
+        data = format_admin_credentials("admin", "$2b$12$hash:with:colons")
+        
+        assert parse_admin_credentials(data) == ("admin", "$2b$12$hash:with:colons")
+    
+    def test_legacy_format(self):
+        assert parse_admin_credentials("admin:$2b$12$dummy_hash\n") == ("admin", "$2b$12$dummy_hash")
+    
+    def test_unknown_version_rejected(self):
+        with pytest.raises(ValueError):
+            parse_admin_credentials('{"v": 99, "u": "admin", "h": "hash"}')
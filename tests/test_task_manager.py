@@ -0,0 +1,162 @@
+"""
+Mail-Rulez - Intelligent Email Management System
+Copyright (c) 2024 Real Project Management Solutions
+
+This software is dual-licensed:
+1. AGPL v3 for open source/self-hosted use
+2. Commercial license for hosted services and enterprise use
+
+For commercial licensing, contact: license@mail-rulez.com
+See LICENSE-DUAL for complete licensing information.
+"""
+
+
+"""
+Unit Tests for TaskManager and EmailProcessor change tracking
+
+Covers the version counters and accessors the web routes use to decide
+when cached responses must be rebuilt. Kept apart from test_services.py,
+which also needs the scheduler manager.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from services.email_processor import EmailProcessor
+from services.task_manager import TaskManager, shutdown_task_manager
+from config import AccountConfig
+
+
+@pytest.fixture
+def mock_account_config():
+    """Create mock account configuration"""
+    return AccountConfig(
+        name="test_account",
+        server="test.example.com",
+        email="test@example.com",
+        password="test_password"
+    )
+
+
+class TestEmailProcessorStateVersion:
+    """Test EmailProcessor state_version tracking"""
+    
+    @pytest.fixture
+    def email_processor(self, mock_account_config):
+        """Create EmailProcessor instance for testing"""
+        with patch('services.email_processor.get_config'):
+            processor = EmailProcessor(mock_account_config)
+            yield processor
+            # Cleanup
+            if processor.scheduler.running:
+                processor.scheduler.shutdown(wait=False)
+    
+    def test_state_version_bumped_on_status_changes(self, email_processor):
+        """Test state_version moves whenever the reported status changes"""
+        # Arrange
+        version = email_processor.state_version
+        
+        # Act / Assert
+        email_processor._update_stats({'emails_processed': 5}, 1.0)
+        assert email_processor.state_version > version
+        
+        version = email_processor.state_version
+        email_processor._handle_processing_error(Exception("boom"), "test")
+        assert email_processor.state_version > version
+        
+        version = email_processor.state_version
+        email_processor._reset_error_count()
+        assert email_processor.state_version > version
+        assert email_processor.consecutive_errors == 0
+
+
+class TestTaskManagerTracking:
+    """Test TaskManager accessors and history versioning"""
+    
+    @pytest.fixture
+    def task_manager(self):
+        """Create TaskManager instance for testing"""
+        # Reset global task manager
+        shutdown_task_manager()
+        manager = TaskManager(max_workers=2)
+        yield manager
+        # Cleanup
+        manager.shutdown()
+    
+    def test_account_count(self, task_manager, mock_account_config):
+        """Test counting managed accounts"""
+        assert task_manager.account_count() == 0
+        
+        task_manager.add_account(mock_account_config)
+        
+        assert task_manager.account_count() == 1
+    
+    def test_account_emails(self, task_manager, mock_account_config):
+        """Test listing managed account emails"""
+        assert task_manager.account_emails() == []
+        
+        task_manager.add_account(mock_account_config)
+        
+        assert task_manager.account_emails() == ['test@example.com']
+    
+    def test_get_snapshot(self, task_manager, mock_account_config):
+        """Test getting a combined status snapshot"""
+        # Arrange
+        task_manager.add_account(mock_account_config)
+        
+        # Act
+        result = task_manager.get_snapshot(history_limit=5)
+        
+        # Assert
+        assert 'total_accounts' in result['aggregate']
+        assert 'test@example.com' in result['all_status']['accounts']
+        assert isinstance(result['task_history'], list)
+        assert len(result['task_history']) <= 5
+    
+    def test_history_version_increments(self, task_manager, mock_account_config):
+        """Test that task history changes bump the history version"""
+        # Arrange
+        version = task_manager.history_version
+        
+        # Act
+        task_manager.add_account(mock_account_config)
+        
+        # Assert
+        assert task_manager.history_version == version + 1
+        assert task_manager.get_snapshot()['history_version'] == version + 1
+    
+    def test_concurrent_task_logging(self, task_manager):
+        """Test that concurrent _log_task calls keep the version and history in step"""
+        import threading
+        
+        # Arrange
+        task_manager.max_history_size = 50
+        
+        def log_many():
+            for i in range(200):
+                task_manager._log_task('test', {'i': i})
+        
+        threads = [threading.Thread(target=log_many) for _ in range(4)]
+        
+        # Act
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        # Assert
+        assert task_manager.history_version == 800
+        assert len(task_manager.task_history) == 50
+    
+    def test_log_task_while_lock_held(self, task_manager, mock_account_config):
+        """Test that status calls logging transitions under the manager lock don't deadlock"""
+        # Arrange
+        task_manager.add_account(mock_account_config)
+        
+        # Act: add/remove log under _lock, and get_all_status may as well
+        task_manager.get_all_status()
+        result = task_manager.remove_account(mock_account_config.email)
+        
+        # Assert
+        assert result
+        assert task_manager.history_version == 2
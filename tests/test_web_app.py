@@ -24,6 +24,25 @@ from web.app import create_app
 from config import Config
 
 
+@pytest.fixture
+def app():
+    """Test app in a temporary config dir, with CSRF checks disabled"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with patch.dict(os.environ, {}, clear=True):
+            app = create_app(config_dir=temp_dir, testing=True)
+            app.config['WTF_CSRF_ENABLED'] = False
+            yield app
+
+
+@pytest.fixture
+def client(app):
+    """Test client signed in as admin"""
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['username'] = 'admin'
+        yield client
+
+
 class TestWebApp:
     def test_app_creation(self):
         """Test that Flask app can be created"""
@@ -128,6 +147,432 @@ class TestWebApp:
                 assert b'404 Not Found' in response.data
 
 
+class TestLogin:
+    @pytest.fixture(autouse=True)
+    def admin_user(self, app):
+        """Set up an admin user with a known password"""
+        from security import format_admin_credentials
+        
+        admin_file = app.mail_config.config_dir / '.admin_user'
+        admin_file.write_text(format_admin_credentials(
+            'admin', app.security_manager.hash_user_password('correct-password')
+        ))
+    
+    def test_signed_in_user_skips_login_form(self, client):
+        """Test that GET /auth/login redirects an already signed-in user"""
+        response = client.get('/auth/login')
+        assert response.status_code == 302
+        assert response.location.endswith('/overview')
+    
+    def test_signed_in_user_redirect_stays_on_site(self, client):
+        """Test GET /auth/login only follows 'next' to pages on this site"""
+        for next_page in ('/rules/', 'http://localhost/lists/'):
+            response = client.get('/auth/login', query_string={'next': next_page})
+            assert response.status_code == 302
+            assert response.location == next_page
+        
+        for next_page in ('https://evil.example', '//evil.example', '/\\evil.example',
+                          ' //evil.example', 'javascript:alert(1)', 'http://localhost.evil.example/'):
+            response = client.get('/auth/login', query_string={'next': next_page})
+            assert response.status_code == 302
+            assert response.location.endswith('/overview'), next_page
+    
+    def test_signed_in_user_login_still_checks_password(self, app, client):
+        """Test that re-submitting the login form with a wrong password fails"""
+        response = client.post('/auth/login', data={
+            'username': 'admin',
+            'password': 'wrong-password'
+        })
+        assert response.status_code == 200
+        assert b'Invalid username or password' in response.data
+        assert app.security_manager._failed_attempts['admin']['count'] == 1
+        app.security_manager.clear_failed_attempts('admin')
+        
+        response = client.post('/auth/login', data={
+            'username': 'admin',
+            'password': 'correct-password'
+        })
+        assert response.status_code == 302
+    
+    def test_changed_admin_file_is_picked_up(self, app):
+        """Test a rewritten admin file is re-read even when its mtime is unchanged"""
+        from security import format_admin_credentials, write_secure_file
+        
+        admin_file = app.mail_config.config_dir / '.admin_user'
+        
+        with app.test_client() as client:
+            response = client.post('/auth/login', data={
+                'username': 'admin',
+                'password': 'correct-password'
+            })
+            assert response.status_code == 302
+            client.get('/auth/logout')
+            
+            # Replace the file (as the reset tool would), keeping its mtime
+            st = admin_file.stat()
+            write_secure_file(admin_file, format_admin_credentials(
+                'admin', app.security_manager.hash_user_password('new-password')
+            ))
+            os.utime(admin_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+            
+            response = client.post('/auth/login', data={
+                'username': 'admin',
+                'password': 'new-password'
+            })
+            assert response.status_code == 302
+
+
+class TestServicesRoutes:
+    @pytest.fixture
+    def client(self, client):
+        """Signed-in test client whose service routes use a fresh task manager"""
+        from config import AccountConfig
+        from services.task_manager import TaskManager
+        from web.routes import services
+        
+        manager = TaskManager(max_workers=2)
+        manager.add_account(AccountConfig(
+            name="test_account",
+            server="test.example.com",
+            email="test@example.com",
+            password="test_password"
+        ))
+        services._account_status_cache.clear()
+        for cache in (services._status_cache, services._stats_cache, services._history_cache):
+            cache.update(key=None, timestamp=0.0, body=None)
+        
+        with patch('web.routes.services.get_task_manager', return_value=manager):
+            client.task_manager = manager
+            yield client
+        manager.shutdown()
+    
+    def test_account_status_reencoded_after_state_change(self, client):
+        """Test the cached account status body is rebuilt when the processor changes"""
+        from web.routes import services
+        
+        response = client.get('/api/services/accounts/test@example.com/status')
+        assert response.status_code == 200
+        assert response.get_json()['data']['stats']['emails_processed'] == 0
+        body = services._account_status_cache['test@example.com'][2]
+        
+        # Unchanged processor: the same encoded body is served again
+        response = client.get('/api/services/accounts/test@example.com/status')
+        assert services._account_status_cache['test@example.com'][2] is body
+        
+        processor = client.task_manager._get_processor('test@example.com')
+        processor._update_stats({'emails_processed': 5}, 1.0)
+        
+        response = client.get('/api/services/accounts/test@example.com/status')
+        assert response.get_json()['data']['stats']['emails_processed'] == 5
+        assert services._account_status_cache['test@example.com'][2] is not body
+    
+    def test_task_history_reencoded_after_history_change(self, client):
+        """Test /task-history is rebuilt when a task is logged"""
+        response = client.get('/api/services/task-history')
+        assert response.get_json()['data']['count'] == 1
+        
+        client.task_manager._log_task('test', {})
+        
+        response = client.get('/api/services/task-history')
+        assert response.get_json()['data']['count'] == 2
+    
+    def test_task_history_cache_expires(self, client):
+        """Test /task-history is rebuilt after STATUS_CACHE_TTL even without a version change"""
+        from web.routes import services
+        
+        client.get('/api/services/task-history')
+        # Simulate history that changed without a version bump
+        client.task_manager.task_history.append({'timestamp': '', 'type': 'test', 'details': {}})
+        
+        response = client.get('/api/services/task-history')
+        assert response.get_json()['data']['count'] == 1
+        
+        services._history_cache['timestamp'] -= services.STATUS_CACHE_TTL
+        response = client.get('/api/services/task-history')
+        assert response.get_json()['data']['count'] == 2
+    
+    def test_bulk_start_reports_slow_accounts_as_pending(self, client):
+        """Test accounts still starting at the bulk deadline are pending, not failed"""
+        import threading
+        from web.routes import services
+        
+        release = threading.Event()
+        
+        def slow_start(account_email, mode):
+            release.wait(5)
+            return True
+        
+        with patch.object(client.task_manager, 'start_account', side_effect=slow_start), \
+                patch.object(services, 'BULK_START_TIMEOUT', 0.1):
+            response = client.post('/api/services/bulk/start', json={})
+            release.set()
+        
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['results'] == {}
+        assert data['pending'] == ['test@example.com']
+        assert data['message'] == 'Started 0/1 accounts in startup mode (1 still starting)'
+    
+    def test_bulk_start_collects_results(self, client):
+        """Test a bulk start reports each account's result"""
+        with patch.object(client.task_manager, 'start_account', return_value=True):
+            response = client.post('/api/services/bulk/start', json={'mode': 'maintenance'})
+        
+        data = response.get_json()
+        assert data['results'] == {'test@example.com': True}
+        assert data['pending'] == []
+        assert data['message'] == 'Started 1/1 accounts in maintenance mode'
+    
+    def test_task_history_limit_is_clamped_or_defaulted(self, client):
+        """Test bad /task-history limits fall back or clamp instead of failing"""
+        for _ in range(60):
+            client.task_manager._log_task('test', {})
+        
+        for query, expected in (('limit=abc', 50), ('limit=0', 1), ('limit=-5', 1), ('limit=5000', 61), ('limit=3', 3)):
+            response = client.get(f'/api/services/task-history?{query}')
+            assert response.status_code == 200
+            assert response.get_json()['data']['count'] == expected, query
+    
+    def test_logs_limit_never_rejected(self, client):
+        """Test /logs accepts any limit"""
+        for query in ('limit=abc', 'limit=0', 'limit=-1', 'limit=99999'):
+            response = client.get(f'/api/services/accounts/test@example.com/logs?{query}')
+            assert response.status_code == 200
+            assert len(response.get_json()['data']['logs']) == 1
+    
+    def test_process_batch_limit_must_be_int(self, client):
+        """Test process-batch only accepts an integer limit between 1 and 500"""
+        for limit in ('10', 10.0, 0, 501):
+            response = client.post('/api/services/accounts/test@example.com/process-batch', json={'limit': limit})
+            assert response.status_code == 400, limit
+            assert response.get_json()['error'] == 'Limit must be an integer between 1 and 500'
+    
+    def test_status_and_stats_reencoded_after_history_change(self, client):
+        """Test cached /status and /stats bodies are rebuilt when an account is added"""
+        from config import AccountConfig
+        from web.routes import services
+        
+        response = client.get('/api/services/status')
+        assert list(response.get_json()['data']['accounts']) == ['test@example.com']
+        response = client.get('/api/services/stats')
+        assert response.get_json()['data']['total_accounts'] == 1
+        status_body = services._status_cache['body']
+        
+        # Unchanged history: the encoded body is reused
+        client.get('/api/services/status')
+        assert services._status_cache['body'] is status_body
+        
+        client.task_manager.add_account(AccountConfig(
+            name="second_account",
+            server="test.example.com",
+            email="second@example.com",
+            password="test_password"
+        ))
+        
+        response = client.get('/api/services/status')
+        assert sorted(response.get_json()['data']['accounts']) == ['second@example.com', 'test@example.com']
+        response = client.get('/api/services/stats')
+        assert response.get_json()['data']['total_accounts'] == 2
+    
+    def test_status_reencoded_after_ttl(self, client):
+        """Test /status picks up processor state changes once the cached body expires"""
+        from web.routes import services
+        
+        client.get('/api/services/status')
+        processor = client.task_manager._get_processor('test@example.com')
+        processor._update_stats({'emails_processed': 5}, 1.0)
+        
+        services._status_cache['timestamp'] -= services.STATUS_CACHE_TTL
+        response = client.get('/api/services/status')
+        account = response.get_json()['data']['accounts']['test@example.com']
+        assert account['stats']['emails_processed'] == 5
+    
+    def test_error_bodies(self, client):
+        """Test the pre-encoded error bodies match the regular JSON encoding"""
+        from web.routes import services
+        from web.json_utils import dumps
+        
+        with client.application.app_context():
+            for status, message in ((400, 'Bad request'), (401, 'Authentication required'),
+                                    (404, 'Not found'), (415, 'Content-Type must be application/json'),
+                                    (500, 'Internal server error')):
+                assert services.ERROR_BODIES[status] == dumps({'error': message, 'success': False})
+        
+        response = client.get('/api/services/accounts/missing@example.com/status')
+        assert response.status_code == 404
+        assert response.mimetype == 'application/json'
+        assert response.get_json() == {'success': False, 'error': 'Account missing@example.com not found'}
+        
+        # The shared 404 body is served again for the same account
+        response = client.get('/api/services/accounts/missing@example.com/inbox-count')
+        assert response.status_code == 404
+        assert response.get_json()['error'] == 'Account missing@example.com not found'
+        
+        with client.session_transaction() as sess:
+            sess.clear()
+        response = client.get('/api/services/status')
+        assert response.status_code == 401
+        assert response.data == services.ERROR_BODIES[401]
+        assert response.get_json() == {'success': False, 'error': 'Authentication required'}
+    
+    def test_post_requires_json_content_type(self, client):
+        """Test cross-site style form posts are rejected before reaching an action"""
+        from web.routes import services
+        
+        with patch.object(client.task_manager, 'start_account') as start, \
+                patch.object(client.task_manager, 'stop_account') as stop:
+            response = client.post('/api/services/accounts/test@example.com/start',
+                                   data='{"mode": "startup"}', content_type='text/plain')
+            assert response.status_code == 415
+            assert response.data == services.ERROR_BODIES[415]
+            
+            response = client.post('/api/services/accounts/test@example.com/stop')
+            assert response.status_code == 415
+            
+            start.assert_not_called()
+            stop.assert_not_called()
+    
+    def test_malformed_json_is_bad_request(self, client):
+        """Test malformed or non-object JSON bodies get a 400, not a 500"""
+        from web.routes import services
+        
+        for body in ('{"mode": ', '["startup"]'):
+            response = client.post('/api/services/accounts/test@example.com/mode',
+                                   data=body, content_type='application/json')
+            assert response.status_code == 400, body
+            assert response.data == services.ERROR_BODIES[400]
+    
+    def test_inbox_count_is_not_cached(self, client):
+        """Test each inbox count request asks the server, so processed mail shows at once"""
+        from unittest.mock import Mock
+        
+        processor = client.task_manager._get_processor('test@example.com')
+        mailbox = Mock()
+        mailbox.folder.status.side_effect = [{'MESSAGES': 150}, {'MESSAGES': 50}]
+        
+        with patch.object(processor, 'account', Mock(**{'login.return_value': mailbox})):
+            counts = [
+                client.get('/api/services/accounts/test@example.com/inbox-count').get_json()['data']['inbox_count']
+                for _ in range(2)
+            ]
+        
+        assert counts == [150, 50]
+        mailbox.folder.status.assert_called_with('INBOX', ['MESSAGES'])
+        assert mailbox.logout.call_count == 2
+    
+    def test_full_status(self, client):
+        """Test /status/full combines status, stats and inbox counts"""
+        from web.routes import services
+        
+        with patch.object(services, 'inbox_message_count', return_value=7):
+            response = client.get('/api/services/status/full')
+        
+        data = response.get_json()['data']
+        assert response.status_code == 200
+        assert list(data['system']['accounts']) == ['test@example.com']
+        assert data['stats']['total_accounts'] == 1
+        assert data['inbox'] == {'test@example.com': 7}
+    
+    def test_full_status_reports_slow_inbox_counts_as_unavailable(self, client):
+        """Test /status/full waits once for all inbox counts and reports stragglers as None"""
+        import threading
+        from web.routes import services
+        
+        release = threading.Event()
+        
+        def slow_count(processor):
+            release.wait(5)
+            return 7
+        
+        with patch.object(services, 'inbox_message_count', side_effect=slow_count), \
+                patch.object(services, 'INBOX_COUNT_TIMEOUT', 0.1):
+            response = client.get('/api/services/status/full')
+            release.set()
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['inbox'] == {'test@example.com': None}
+
+
+class TestRuleTemplates:
+    def test_batch_create_skips_existing_and_repeated_templates(self, app, client):
+        """Test /rules/template/batch creates each template's rule once"""
+        response = client.post('/rules/template/batch', json=['package_delivery', 'linkedin', 'linkedin'])
+        data = response.get_json()
+        assert response.status_code == 200
+        assert [rule['name'] for rule in data['rules']] == ['Package Delivery', 'LinkedIn Notifications']
+        assert data['skipped'] == []
+        
+        # Submitting again creates nothing new
+        response = client.post('/rules/template/batch', json=['linkedin', 'receipts_invoices'])
+        data = response.get_json()
+        assert [rule['name'] for rule in data['rules']] == ['Receipts & Invoices']
+        assert data['skipped'] == ['linkedin']
+        
+        with app.app_context():
+            from web.routes.rules import get_rules_engine
+            names = sorted(rule.name for rule in get_rules_engine().get_all_rules())
+        assert names == ['LinkedIn Notifications', 'Package Delivery', 'Receipts & Invoices']
+    
+    def test_concurrent_rule_edits_are_all_saved(self, app):
+        """Test concurrent template batches don't overwrite each other's rules"""
+        import threading
+        
+        names = ['package_delivery', 'receipts_invoices', 'linkedin', 'head_hunter']
+        
+        def create(template_name):
+            with app.test_client() as client:
+                with client.session_transaction() as sess:
+                    sess['username'] = 'admin'
+                client.post('/rules/template/batch', json=[template_name])
+        
+        threads = [threading.Thread(target=create, args=(name,)) for name in names]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        with app.app_context():
+            from web.routes.rules import get_rules_engine
+            assert len(get_rules_engine().get_all_rules()) == len(names)
+    
+    def test_failed_save_leaves_cached_engine_unchanged(self, app, client):
+        """Test a rule whose save fails is not served from the cached engine"""
+        from rules import RulesEngine
+        
+        with patch.object(RulesEngine, 'save_rules', side_effect=OSError('disk full')):
+            response = client.post('/rules/template/batch', json=['linkedin'])
+        assert response.status_code == 500
+        
+        with app.app_context():
+            from web.routes.rules import get_rules_engine
+            assert get_rules_engine().get_all_rules() == []
+    
+    def test_batch_create_rejects_unknown_templates(self, client):
+        """Test /rules/template/batch validates the template names"""
+        response = client.post('/rules/template/batch', json=['package_delivery', 'nope'])
+        assert response.status_code == 404
+        assert response.get_json()['error'] == 'Templates not found: nope'
+        
+        response = client.post('/rules/template/batch', json={})
+        assert response.status_code == 400
+    
+    def test_conditional_responses_are_private(self, client):
+        """Test the rules page and templates API send private, no-cache ETag responses"""
+        # The first page render creates the session's CSRF token
+        client.get('/rules/')
+        
+        for url in ('/rules/', '/rules/api/templates'):
+            response = client.get(url)
+            assert response.status_code == 200, url
+            assert response.get_data()
+            etag = response.get_etag()[0]
+            
+            response = client.get(url, headers={'If-None-Match': f'"{etag}"'})
+            assert response.status_code == 304, url
+            assert response.cache_control.private
+            assert response.cache_control.no_cache
+
+
 class TestWebAppIntegration:
     def test_app_with_existing_config(self):
         """Test app creation with existing configuration"""
@@ -163,4 +608,140 @@ class TestWebAppIntegration:
             
             session_token = session_manager.create_session("test_user")
             session_data = session_manager.get_session(session_token)
-            assert session_data['username'] == "test_user"
\ No newline at end of file
+            assert session_data['username'] == "test_user"
+
+
+class TestDashboardHelpers:
+    def test_recent_activity_cached_per_history_version(self, app):
+        """Test formatted activity is reused until the history version changes"""
+        from web.routes import dashboard
+        
+        def snapshot(version, task_types):
+            return {
+                'all_status': {'task_manager': {'startup_time': '2025-01-01T00:00:00'}},
+                'history_version': version,
+                'task_history': [
+                    {'timestamp': '2025-01-01T12:00:00', 'type': task_type, 'details': {}}
+                    for task_type in task_types
+                ]
+            }
+        
+        with app.app_context():
+            first = dashboard.get_recent_activity(snapshot(1, ['a']))
+            assert dashboard._activity_cache == (('2025-01-01T00:00:00', 1), first)
+            assert dashboard.get_recent_activity(snapshot(1, ['a', 'b'])) is first
+            
+            second = dashboard.get_recent_activity(snapshot(2, ['a', 'b']))
+            assert len(second) == 2
+            assert dashboard._activity_cache == (('2025-01-01T00:00:00', 2), second)
+
+
+class TestListHelpers:
+    def test_load_list_entries_caches_until_file_changes(self):
+        """Test that list files are re-read only when they change"""
+        from web.routes import lists
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            list_path = Path(temp_dir) / "white.txt"
+            list_path.write_text("a@example.com\n\n  b@example.com \n")
+            
+            entries, entry_set = lists.load_list_entries(list_path)
+            assert entries == ["a@example.com", "b@example.com"]
+            assert entry_set == frozenset(entries)
+            
+            with patch.object(lists.pf, 'open_read') as open_read:
+                assert lists.load_list_entries(list_path)[0] == entries
+                open_read.assert_not_called()
+            
+            list_path.write_text("c@example.com\n")
+            assert lists.load_list_entries(list_path)[0] == ["c@example.com"]
+    
+    def test_detect_conflicts(self):
+        """Test conflict detection between list entry sets"""
+        from web.routes.lists import detect_conflicts
+        
+        conflicts = detect_conflicts({
+            'white': frozenset({'a@example.com', 'b@example.com'}),
+            'black': frozenset({'b@example.com'}),
+            'vendor': frozenset({'c@example.com'})
+        })
+        
+        assert conflicts == {
+            'black_vs_white': {'lists': ['black', 'white'], 'emails': ['b@example.com']}
+        }
+    
+    def test_append_and_remove_list_entry(self):
+        """Test list edits drop blank lines and skip duplicates"""
+        from web.routes.lists import append_list_entry, remove_list_entry
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            list_path = Path(temp_dir) / "white.txt"
+            list_path.write_text("a@example.com\n\nb@example.com")
+            
+            assert append_list_entry(list_path, "c@example.com")
+            assert list_path.read_text() == "a@example.com\nb@example.com\nc@example.com\n"
+            assert not append_list_entry(list_path, "c@example.com")
+            
+            remove_list_entry(list_path, "b@example.com")
+            assert list_path.read_text() == "a@example.com\nc@example.com\n"
+            assert os.listdir(temp_dir) == ["white.txt"]
+    
+    def test_list_files_etag_changes_with_lists(self):
+        """Test that the list data ETag tracks list file changes"""
+        from web.routes.lists import list_files_etag
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            list_path = Path(temp_dir) / "white.txt"
+            list_path.write_text("a@example.com\n")
+            all_lists = {'white': list_path}
+            
+            etag = list_files_etag(all_lists)
+            assert list_files_etag(all_lists) == etag
+            
+            list_path.write_text("a@example.com\nb@example.com\n")
+            assert list_files_etag(all_lists) != etag
+            
+            assert list_files_etag({'white': list_path, 'black': Path(temp_dir) / "black.txt"}) != etag
+    
+    def test_list_data_conditional_responses_are_private(self, client):
+        """Test /lists/api/data answers 304 for a matching ETag, never cacheable by proxies"""
+        response = client.get('/lists/api/data')
+        assert response.status_code == 200
+        assert response.cache_control.private
+        assert response.cache_control.no_cache
+        etag = response.get_etag()[0]
+        
+        response = client.get('/lists/api/data', headers={'If-None-Match': f'"{etag}"'})
+        assert response.status_code == 304
+        assert response.cache_control.private
+        assert response.cache_control.no_cache
+    
+    def test_move_entry_keeps_existing_entries(self, app, client):
+        """Test moving an existing entry that fails the email check, but not a new one"""
+        all_lists = app.mail_config.get_all_lists()
+        from_list, to_list = list(all_lists)[:2]
+        all_lists[from_list].write_text("legacy@localhost\n")
+        
+        response = client.post('/lists/api/move', json={
+            'email': 'legacy@localhost', 'from_list': from_list, 'to_list': to_list
+        })
+        assert response.status_code == 200
+        assert all_lists[from_list].read_text() == ''
+        assert 'legacy@localhost' in all_lists[to_list].read_text().split()
+        
+        response = client.post('/lists/api/move', json={
+            'email': 'not-an-email', 'from_list': from_list, 'to_list': to_list
+        })
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid email format'
+    
+    def test_email_validation(self):
+        """Test the list entry email format check"""
+        from web.routes.lists import EMAIL_RE
+        
+        assert EMAIL_RE.match("user@example.com")
+        assert EMAIL_RE.match("first.last@mail.example.co.uk")
+        assert not EMAIL_RE.match("a@b")
+        assert not EMAIL_RE.match(".@.")
+        assert not EMAIL_RE.match("user@@example.com")
+        assert not EMAIL_RE.match("user name@example.com")
@@ -24,8 +24,10 @@ from pathlib import Path
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
 from flask_wtf.csrf import CSRFProtect
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path for imports (only once, so entries don't pile up)
+_parent_dir = str(Path(__file__).parent.parent)
+if _parent_dir not in sys.path:
+    sys.path.insert(0, _parent_dir)
 
 from config import get_config
 from security import get_security_manager
@@ -63,7 +65,13 @@ def create_app(config_dir=None, testing=False):
     app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY') or 'dev-key-change-in-production'
     app.config['WTF_CSRF_TIME_LIMIT'] = 3600  # 1 hour
     app.config['PERMANENT_SESSION_LIFETIME'] = 24 * 3600  # 24 hour session timeout to match SecurityManager
+    # Don't re-sign and re-send the session cookie on every response (the dashboard
+    # polls several JSON endpoints); the cookie is refreshed whenever the session changes
+    # and expires 24 hours after login, matching SecurityManager's absolute timeout
+    app.config['SESSION_REFRESH_EACH_REQUEST'] = False
     app.config['TESTING'] = testing
+    # No endpoint takes uploads; refuse larger bodies before they are parsed
+    app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024
     
     # Initialize CSRF protection
     csrf = CSRFProtect(app)
@@ -79,6 +87,8 @@ def create_app(config_dir=None, testing=False):
     # Store managers in app context for access in routes
     app.mail_config = mail_config
     app.security_manager = security_manager
+    app.setup_completed = False  # Set once the admin user is known to exist
+    app.admin_credentials = None  # (file stamp, username, password_hash) from the admin file
     
     # Register error handlers
     @app.errorhandler(404)
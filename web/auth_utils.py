@@ -0,0 +1,31 @@
+"""
+Mail-Rulez - Intelligent Email Management System
+Copyright (c) 2024 Real Project Management Solutions
+
+This software is dual-licensed:
+1. AGPL v3 for open source/self-hosted use
+2. Commercial license for hosted services and enterprise use
+
+For commercial licensing, contact: license@mail-rulez.com
+See LICENSE-DUAL for complete licensing information.
+"""
+
+
+"""
+Authentication helpers shared by the Mail-Rulez web blueprints
+"""
+
+from functools import wraps
+from flask import current_app, redirect, url_for, request
+
+
+def login_required(f):
+    """Decorator to require authentication for routes"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # Authenticated requests go straight through; the login redirect
+        # is only built for anonymous ones
+        if current_app.get_current_user():
+            return f(*args, **kwargs)
+        return redirect(url_for('auth.login', next=request.url))
+    return decorated_function
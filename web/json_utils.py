@@ -0,0 +1,50 @@
+"""
+Mail-Rulez - Intelligent Email Management System
+Copyright (c) 2024 Real Project Management Solutions
+
+This software is dual-licensed:
+1. AGPL v3 for open source/self-hosted use
+2. Commercial license for hosted services and enterprise use
+
+For commercial licensing, contact: license@mail-rulez.com
+See LICENSE-DUAL for complete licensing information.
+"""
+
+
+"""
+JSON response helpers for Mail-Rulez web interface
+
+Serializes API responses with orjson when it is installed and falls back
+to Flask's built-in JSON provider otherwise.
+"""
+
+from flask import current_app
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+if orjson is not None:
+    # Match Flask's default provider: sorted keys, non-string keys allowed
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj):
+    """Serialize obj to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+    return current_app.json.dumps(obj).encode('utf-8')
+
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return current_app.json.loads(data)
+
+
+def json_response(obj, status=200):
+    """Build an application/json response for obj"""
+    return current_app.response_class(dumps(obj), status=status, mimetype='application/json')
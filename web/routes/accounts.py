@@ -19,32 +19,34 @@ Handles IMAP account configuration and management.
 
 import sys
 from pathlib import Path
-from flask import Blueprint, render_template, redirect, url_for, flash, current_app, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, current_app, request
 from flask_wtf import FlaskForm
+from flask_wtf.csrf import validate_csrf
 from wtforms import StringField, PasswordField, IntegerField, SelectField, FieldList, FormField, SubmitField
 from wtforms.validators import DataRequired, Email, NumberRange, Length
-from functools import wraps
 import imaplib
+import re
 import ssl
 import socket
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-from config import AccountConfig
+# Add parent directory to path for imports (only once, so entries don't pile up)
+_parent_dir = str(Path(__file__).parent.parent.parent)
+if _parent_dir not in sys.path:
+    sys.path.insert(0, _parent_dir)
+from config import AccountConfig, Config
 from services.email_processor import EmailProcessor
+from web.json_utils import json_response
+from web.auth_utils import login_required
 
 
 accounts_bp = Blueprint('accounts', __name__)
 
+# IMAP LIST response line: (flags) "delimiter" "name"
+LIST_RESPONSE_RE = re.compile(r'\(([^)]*)\)\s+"([^"]*)"\s+"?([^"]*)"?')
 
-def login_required(f):
-    """Decorator to require authentication for routes"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not current_app.get_current_user():
-            return redirect(url_for('auth.login', next=request.url))
-        return f(*args, **kwargs)
-    return decorated_function
+# Gmail system containers that is_user_folder() always rejects; checked
+# up front so large Gmail label lists skip the full classification
+SYSTEM_FOLDER_NAMES = frozenset({'[Gmail]', '[Google Mail]'})
 
 
 class FolderConfigForm(FlaskForm):
@@ -116,7 +118,6 @@ class AccountForm(FlaskForm):
 def list_accounts():
     """List all configured email accounts"""
     # Force reload config to get latest saved accounts
-    from config import Config
     fresh_config = Config(current_app.mail_config.base_dir, current_app.mail_config.config_file, current_app.mail_config.use_encryption)
     accounts = fresh_config.accounts
     current_app.logger.info(f"Accounts list page loaded {len(accounts)} accounts from config")
@@ -178,7 +179,6 @@ def add_account():
 def edit_account(account_name):
     """Edit existing email account"""
     # Force reload config to get latest saved accounts
-    from config import Config
     fresh_config = Config(current_app.mail_config.base_dir, current_app.mail_config.config_file, current_app.mail_config.use_encryption)
     
     # Find the account
@@ -266,7 +266,6 @@ def delete_account(account_name):
     """Delete email account"""
     try:
         # Force reload config to get latest saved accounts
-        from config import Config
         fresh_config = Config(current_app.mail_config.base_dir, current_app.mail_config.config_file, current_app.mail_config.use_encryption)
         
         # Find and remove the account
@@ -300,7 +299,6 @@ def test_connection(account_name):
     """Test IMAP connection for an account"""
     try:
         # Force reload config to get latest saved accounts
-        from config import Config
         fresh_config = Config(current_app.mail_config.base_dir, current_app.mail_config.config_file, current_app.mail_config.use_encryption)
         
         # Find the account
@@ -311,15 +309,15 @@ def test_connection(account_name):
                 break
         
         if not account:
-            return jsonify({'success': False, 'error': f'Account "{account_name}" not found'})
+            return json_response({'success': False, 'error': f'Account "{account_name}" not found'})
         
         # Test connection
         result = test_imap_connection(account)
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
         current_app.logger.error(f"Error testing connection: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return json_response({'success': False, 'error': str(e)})
 
 
 @accounts_bp.route('/api/test-connection', methods=['POST'])
@@ -328,12 +326,11 @@ def api_test_connection():
     """Test IMAP connection with provided credentials"""
     try:
         # Validate CSRF token manually for better error handling
-        from flask_wtf.csrf import validate_csrf
         try:
             validate_csrf(request.headers.get('X-CSRFToken'))
         except Exception as e:
             current_app.logger.warning(f"CSRF validation failed: {e}")
-            return jsonify({'success': False, 'error': 'CSRF token validation failed. Please refresh the page.'}), 400
+            return json_response({'success': False, 'error': 'CSRF token validation failed. Please refresh the page.'}, 400)
         
         data = request.get_json()
         
@@ -357,11 +354,11 @@ def api_test_connection():
         if result.get('success'):
             result['suggested_folders'] = generate_folder_suggestions(result)
         
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
         current_app.logger.error(f"Error testing connection: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return json_response({'success': False, 'error': str(e)})
 
 
 def test_imap_connection(account, timeout=30):
@@ -401,8 +398,7 @@ def test_imap_connection(account, timeout=30):
                         folder_line = folder_line.decode('utf-8')
                     
                     # Parse IMAP LIST response: (flags) "delimiter" "name"
-                    import re
-                    match = re.match(r'\(([^)]*)\)\s+"([^"]*)"\s+"?([^"]*)"?', folder_line)
+                    match = LIST_RESPONSE_RE.match(folder_line)
                     if match:
                         flags, delimiter, name = match.groups()
                         folder_name = name.strip('"')
@@ -515,6 +511,19 @@ def is_user_folder(folder_name, flags):
     return False
 
 
+def extract_folder_name(folder_item):
+    """
+    Extract the folder name from a raw IMAP LIST response item
+    
+    The format is usually: (flags) "delimiter" "folder_name", so the last
+    quoted string is taken as the folder name.
+    """
+    if isinstance(folder_item, bytes):
+        folder_item = folder_item.decode('utf-8')
+    parts = folder_item.split('"')
+    return parts[-2] if len(parts) >= 3 else None
+
+
 def analyze_folder_structure(folders_raw):
     """Analyze IMAP folder structure to determine naming convention"""
     if not folders_raw:
@@ -528,8 +537,7 @@ def analyze_folder_structure(folders_raw):
             folder_line = folder_line.decode('utf-8')
         
         # Extract folder name and delimiter
-        import re
-        match = re.match(r'\(([^)]*)\)\s+"([^"]*)"\s+"?([^"]*)"?', folder_line)
+        match = LIST_RESPONSE_RE.match(folder_line)
         if match:
             flags, delimiter, name = match.groups()
             name = name.strip('"')
@@ -650,7 +658,6 @@ def save_account(account):
     """Save a new account to configuration"""
     try:
         # Force reload config to get latest saved accounts before adding new one
-        from config import Config
         fresh_config = Config(current_app.mail_config.base_dir, current_app.mail_config.config_file, current_app.mail_config.use_encryption)
         
         # Add account to fresh config and save
@@ -689,7 +696,6 @@ def create_folders(account_name):
     """Display folder creation page and handle folder creation"""
     try:
         # Force reload config to get latest saved accounts
-        from config import Config
         fresh_config = Config(current_app.mail_config.base_dir, current_app.mail_config.config_file, current_app.mail_config.use_encryption)
         
         # Find the account
@@ -757,18 +763,13 @@ def get_account_folders(account_email):
     """API endpoint to get folders for a specific account (for rules dropdown)"""
     try:
         # Force reload config to get latest saved accounts
-        from config import Config
         fresh_config = Config(current_app.mail_config.base_dir, current_app.mail_config.config_file, current_app.mail_config.use_encryption)
         
         # Find the account
-        account = None
-        for acc in fresh_config.accounts:
-            if acc.email == account_email:
-                account = acc
-                break
+        account = fresh_config.get_account_by_email(account_email)
         
         if not account:
-            return {'success': False, 'error': 'Account not found'}, 404
+            return json_response({'success': False, 'error': 'Account not found'}, 404)
         
         # Get folder list from IMAP server
         folders = []
@@ -782,32 +783,31 @@ def get_account_folders(account_email):
             mb.logout()
             
             if result == 'OK':
-                for folder_item in folder_list:
-                    # Parse folder item - format is usually: (flags) "delimiter" "folder_name"
-                    if isinstance(folder_item, bytes):
-                        folder_item = folder_item.decode('utf-8')
-                    
-                    # Extract folder name from IMAP response
-                    parts = folder_item.split('"')
-                    if len(parts) >= 3:
-                        folder_name = parts[-2]  # Usually the last quoted string is the folder name
-                        if folder_name and is_user_folder(folder_name, None):
-                            folders.append(folder_name)
+                folders = [
+                    folder_name for folder_item in folder_list
+                    if (folder_name := extract_folder_name(folder_item))
+                    and folder_name not in SYSTEM_FOLDER_NAMES
+                    and is_user_folder(folder_name, None)
+                ]
             
             # Add common folders from account configuration if not already in list
-            if hasattr(account, 'folders') and account.folders:
+            # (AccountConfig always populates folders in __post_init__)
+            account_folders = account.folders
+            if account_folders:
                 config_folders = [
-                    account.folders.get('processed'),
-                    account.folders.get('pending'), 
-                    account.folders.get('junk'),
-                    account.folders.get('approved_ads'),
-                    account.folders.get('whitelist'),
-                    account.folders.get('blacklist'),
-                    account.folders.get('vendor')
+                    account_folders.get('processed'),
+                    account_folders.get('pending'), 
+                    account_folders.get('junk'),
+                    account_folders.get('approved_ads'),
+                    account_folders.get('whitelist'),
+                    account_folders.get('blacklist'),
+                    account_folders.get('vendor')
                 ]
                 
+                seen = set(folders)
                 for folder in config_folders:
-                    if folder and folder not in folders and folder != 'INBOX':
+                    if folder and folder not in seen and folder != 'INBOX':
+                        seen.add(folder)
                         folders.append(folder)
             
             # Sort folders
@@ -816,14 +816,14 @@ def get_account_folders(account_email):
         except Exception as e:
             current_app.logger.warning(f"Could not fetch folders for {account_email}: {e}")
             # Return basic folders from configuration as fallback
-            if hasattr(account, 'folders') and account.folders:
+            if account.folders:
                 folders = [folder for folder in account.folders.values() 
                           if folder and folder != 'INBOX']
             else:
                 folders = ['INBOX.Processed', 'INBOX.Pending', 'INBOX.Packages', 'INBOX.Receipts']
         
-        return {'success': True, 'folders': folders}
+        return json_response({'success': True, 'folders': folders})
         
     except Exception as e:
         current_app.logger.error(f"Error getting folders for account {account_email}: {e}")
-        return {'success': False, 'error': str(e)}, 500
\ No newline at end of file
+        return json_response({'success': False, 'error': str(e)}, 500)
\ No newline at end of file
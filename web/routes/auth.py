@@ -23,6 +23,10 @@ from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SubmitField
 from wtforms.validators import DataRequired, Length
 import os
+from urllib.parse import urljoin, urlsplit
+
+from security import write_secure_file, format_admin_credentials, parse_admin_credentials
+from web.json_utils import json_response
 
 
 auth_bp = Blueprint('auth', __name__)
@@ -81,6 +85,12 @@ def login():
     if needs_initial_setup():
         return redirect(url_for('auth.setup'))
     
+    # Already signed in: skip the form (and its password hashing) entirely.
+    # Submitted logins always go through the full credential check, so the
+    # session's expiry is never extended without the password.
+    if request.method == 'GET' and current_app.get_current_user():
+        return redirect_after_login()
+    
     form = LoginForm()
     
     if form.validate_on_submit():
@@ -91,7 +101,7 @@ def login():
         if current_app.security_manager.is_account_locked(username):
             flash('Account is temporarily locked due to too many failed login attempts. Please try again later.', 'error')
             return render_template('auth/login.html', form=form)
-        
+
         # Verify credentials
         if verify_user_credentials(username, password):
             # Clear failed login attempts
@@ -104,10 +114,7 @@ def login():
             flash(f'Welcome back, {username}!', 'success')
             
             # Redirect to originally requested page or dashboard
-            next_page = request.args.get('next')
-            if next_page:
-                return redirect(next_page)
-            return redirect(url_for('dashboard.overview'))
+            return redirect_after_login()
         else:
             # Record failed login attempt
             current_app.security_manager.record_failed_login(username)
@@ -116,6 +123,30 @@ def login():
     return render_template('auth/login.html', form=form)
 
 
+def redirect_after_login():
+    """Redirect to the 'next' page if it is on this site, else the dashboard"""
+    next_page = request.args.get('next')
+    if next_page and is_same_site_url(next_page):
+        return redirect(next_page)
+    return redirect(url_for('dashboard.overview'))
+
+
+def is_same_site_url(target):
+    """
+    Check that a redirect target stays on this host
+    
+    Accepts relative paths and absolute URLs for the current host (as
+    login_required puts in 'next'); rejects other hosts, including
+    protocol-relative '//host' and '/\\host' forms browsers accept.
+    """
+    # Browsers drop surrounding whitespace and control characters
+    if target != target.strip() or any(ord(c) < 0x20 for c in target):
+        return False
+    host = urlsplit(request.host_url)
+    url = urlsplit(urljoin(request.host_url, target.replace('\\', '/')))
+    return url.scheme in ('http', 'https') and url.netloc == host.netloc
+
+
 @auth_bp.route('/logout')
 def logout():
     """Handle user logout"""
@@ -155,28 +186,38 @@ def setup():
 
 def needs_initial_setup():
     """Check if initial setup is needed"""
+    # Once setup has completed it never needs to be re-checked
+    if current_app.setup_completed:
+        return False
+    
     # Check if admin user exists in config directory (persistent storage)
     admin_file = current_app.mail_config.config_dir / '.admin_user'
+    try:
+        admin_file.stat()
+        current_app.setup_completed = True
+        return False
+    except FileNotFoundError:
+        pass
     
     # Migration: check old location and move to new location if needed
     old_admin_file = current_app.mail_config.base_dir / '.admin_user'
     
-    if not admin_file.exists() and old_admin_file.exists():
+    if old_admin_file.exists():
         try:
             # Migrate admin file from old location to new persistent location
             admin_file.parent.mkdir(parents=True, exist_ok=True)
-            admin_file.write_text(old_admin_file.read_text())
-            admin_file.chmod(0o600)
+            write_secure_file(admin_file, old_admin_file.read_text())
             
             # Remove old file
             old_admin_file.unlink()
             
             current_app.logger.info("Migrated admin file from base_dir to config_dir")
+            current_app.setup_completed = True
             return False  # Setup not needed, migration completed
         except Exception as e:
             current_app.logger.error(f"Failed to migrate admin file: {e}")
     
-    return not admin_file.exists()
+    return True
 
 
 def create_admin_user(username, password):
@@ -187,14 +228,13 @@ def create_admin_user(username, password):
         
         # Store admin credentials in config directory (persistent storage)
         admin_file = current_app.mail_config.config_dir / '.admin_user'
-        admin_data = f"{username}:{hashed_password}"
+        admin_data = format_admin_credentials(username, hashed_password)
         
         # Ensure config directory exists
         admin_file.parent.mkdir(parents=True, exist_ok=True)
-        admin_file.write_text(admin_data)
-        
-        # Set restrictive permissions
-        admin_file.chmod(0o600)
+        write_secure_file(admin_file, admin_data)
+        remember_admin_credentials(admin_file, username, hashed_password)
+        current_app.setup_completed = True
         
         return True
     except Exception as e:
@@ -202,23 +242,69 @@ def create_admin_user(username, password):
         return False
 
 
+def load_admin_credentials():
+    """
+    Get the stored admin (username, password_hash), or None if not set up
+    
+    The parsed file is cached on the app and only re-read when its stamp
+    changes, e.g. after a reset with the CLI tool or by another worker.
+    """
+    admin_file = current_app.mail_config.config_dir / '.admin_user'
+    
+    try:
+        stamp = admin_file_stamp(admin_file)
+    except FileNotFoundError:
+        current_app.admin_credentials = None
+        return None
+    
+    cached = current_app.admin_credentials
+    if cached is None or cached[0] != stamp:
+        stored_username, stored_hash = parse_admin_credentials(admin_file.read_text())
+        cached = (stamp, stored_username, stored_hash)
+        current_app.admin_credentials = cached
+    
+    return cached[1], cached[2]
+
+
+def admin_file_stamp(admin_file):
+    """
+    Get (mtime_ns, size, inode) of the admin file
+    
+    The inode changes on every atomic rewrite, so a replacement is noticed
+    even when it lands within the filesystem's mtime granularity.
+    """
+    st = admin_file.stat()
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def remember_admin_credentials(admin_file, username, hashed_password):
+    """Update the cached admin credentials after rewriting the admin file"""
+    current_app.admin_credentials = (admin_file_stamp(admin_file), username, hashed_password)
+
+
 def verify_user_credentials(username, password):
     """Verify user login credentials"""
     try:
-        admin_file = current_app.mail_config.config_dir / '.admin_user'
+        credentials = load_admin_credentials()
+        if credentials is None:
+            # Take as long as a real check so a missing admin is not observable
+            return current_app.security_manager.verify_dummy_password(password)
         
-        if not admin_file.exists():
-            return False
+        stored_username, stored_hash = credentials
         
-        admin_data = admin_file.read_text().strip()
-        stored_username, stored_hash = admin_data.split(':', 1)
+        # Check username and password. Both checks always run so the response
+        # time does not reveal which of the two was wrong.
+        username_ok = current_app.security_manager.secure_compare(username, stored_username)
+        password_ok = current_app.security_manager.verify_user_password(password, stored_hash)
+        if not (username_ok & password_ok):
+            return False
         
-        # Check username and password
-        if (current_app.security_manager.secure_compare(username, stored_username) and
-            current_app.security_manager.verify_user_password(password, stored_hash)):
-            return True
+        # Transparently upgrade legacy bcrypt or outdated Argon2 hashes
+        if current_app.security_manager.password_needs_rehash(stored_hash):
+            if change_admin_password(stored_username, password):
+                current_app.logger.info("Upgraded admin password hash to Argon2id")
         
-        return False
+        return True
     except Exception as e:
         current_app.logger.error(f"Failed to verify credentials: {e}")
         return False
@@ -229,13 +315,13 @@ def session_status():
     """API endpoint to check session status"""
     username = session.get('username')
     if username:
-        return {
+        return json_response({
             'authenticated': True,
             'username': username,
             'expires_in': 'TODO'  # Calculate remaining time
-        }
+        })
     
-    return {'authenticated': False}
+    return json_response({'authenticated': False})
 
 
 @auth_bp.route('/change-password', methods=['GET', 'POST'])
@@ -288,10 +374,10 @@ def change_admin_password(username, new_password):
 
         # Update admin credentials in config directory
         admin_file = current_app.mail_config.config_dir / '.admin_user'
-        admin_data = f"{username}:{hashed_password}"
+        admin_data = format_admin_credentials(username, hashed_password)
 
-        admin_file.write_text(admin_data)
-        admin_file.chmod(0o600)
+        write_secure_file(admin_file, admin_data)
+        remember_admin_credentials(admin_file, username, hashed_password)
 
         return True
     except Exception as e:
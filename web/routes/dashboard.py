@@ -18,25 +18,33 @@ Provides overview, statistics, and system status information.
 """
 
 from flask import Blueprint, render_template, jsonify, current_app, redirect, url_for, request
-from functools import wraps
+from functools import lru_cache
 import psutil
 import os
 import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from config import count_list_entries
+from services.task_manager import get_task_manager
+from web.json_utils import json_response
+from web.auth_utils import login_required
+
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+# System stats are polled by every dashboard client; serve them from a short-lived cache
+SYSTEM_STATS_TTL = 2.0  # seconds
+_system_stats_cache = {'timestamp': 0.0, 'data': None}
+
+# Formatted recent activity, rebuilt only when the task history changes:
+# (key, activities), always replaced as a whole so readers never see a
+# new key with old activities
+_activity_cache = (None, [])
 
-def login_required(f):
-    """Decorator to require authentication for routes"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not current_app.get_current_user():
-            return redirect(url_for('auth.login', next=request.url))
-        return f(*args, **kwargs)
-    return decorated_function
+# Prime psutil's CPU counters so non-blocking cpu_percent() calls have a baseline
+psutil.cpu_percent(interval=None)
 
 
 @dashboard_bp.route('/')
@@ -47,28 +55,19 @@ def overview():
     # DEPLOYMENT TEST LOG - Build 53 verification
     current_app.logger.info("DEPLOYMENT_TEST: Dashboard overview route accessed - Build 53 is active")
     
-    # Get system stats
-    stats = get_system_stats()
-    
-    # Get processing stats
-    processing_stats = get_processing_stats()
+    # Only the service mode panel and the account table are server-rendered;
+    # system/processing stats and activity are served by /api/stats
     
-    # Get recent activity
-    recent_activity = get_recent_activity()
+    # Collect task manager state once and share it between the collectors below
+    snapshot = get_dashboard_snapshot()
     
-    # Get account stats
-    account_stats = get_account_stats()
+    # Get account stats and account details for table
+    account_stats, accounts = collect_account_view(snapshot)
     
     # Get service mode information
-    service_info = get_service_info()
-
-    # Get account details for table
-    accounts = get_account_details()
+    service_info = get_service_info(snapshot)
 
     return render_template('dashboard/overview.html',
-                         stats=stats,
-                         processing_stats=processing_stats,
-                         recent_activity=recent_activity,
                          account_count=account_stats.get('active_accounts', 0),
                          service_info=service_info,
                          accounts=accounts)
@@ -81,21 +80,24 @@ def api_stats():
     # DEPLOYMENT TEST LOG - Build 53 verification for API endpoint
     current_app.logger.info("DEPLOYMENT_TEST: Dashboard API stats endpoint called - Build 53 is active")
     
-    # Get recent activity and convert datetime objects to strings for JSON
-    recent_activity = get_recent_activity()
-    activity_json = []
-    for activity in recent_activity[:5]:  # Limit to 5 most recent
-        activity_json.append({
+    # Collect task manager state once and share it between the collectors below
+    snapshot = get_dashboard_snapshot()
+    
+    # Recent activity is cached with its display strings already formatted
+    activity_json = [
+        {
             'message': activity['message'],
             'timestamp_str': activity['timestamp_str'],
             'status': activity['status']
-        })
+        }
+        for activity in get_recent_activity(snapshot)[:5]  # Limit to 5 most recent
+    ]
     
-    return jsonify({
+    return json_response({
         'system': get_system_stats(),
-        'processing': get_processing_stats(),
+        'processing': get_processing_stats(snapshot),
         'lists': get_list_stats(),
-        'accounts': get_account_stats(),
+        'accounts': get_account_stats(snapshot),
         'recent_activity': activity_json
     })
 
@@ -108,17 +110,50 @@ def api_logs():
     return jsonify({'logs': logs})
 
 
+@lru_cache(maxsize=256)
+def format_iso_timestamp(iso_str, fmt):
+    """Format an ISO-8601 timestamp string for display (memoized per string/format)"""
+    return datetime.fromisoformat(iso_str).strftime(fmt)
+
+
+def get_dashboard_snapshot():
+    """
+    Get a task manager snapshot (aggregate stats, status, recent history)
+    
+    Returns:
+        dict: Snapshot from TaskManager.get_snapshot(), or None if unavailable
+    """
+    try:
+        task_manager = get_task_manager()
+        if not task_manager:
+            current_app.logger.warning("Task manager not available")
+            return None
+        
+        return task_manager.get_snapshot(history_limit=10)
+    except Exception as e:
+        current_app.logger.error(f"Error getting task manager snapshot: {e}", exc_info=True)
+        return None
+
+
 def get_system_stats():
-    """Get system resource statistics"""
+    """Get system resource statistics (cached for SYSTEM_STATS_TTL seconds)"""
+    now = time.monotonic()
+    if _system_stats_cache['data'] is not None and now - _system_stats_cache['timestamp'] < SYSTEM_STATS_TTL:
+        return _system_stats_cache['data']
+    
     try:
-        return {
-            'cpu_percent': psutil.cpu_percent(interval=1),
+        stats = {
+            # Non-blocking: CPU usage since the previous call
+            'cpu_percent': psutil.cpu_percent(interval=None),
             'memory_percent': psutil.virtual_memory().percent,
             'disk_usage': psutil.disk_usage('/').percent,
             'uptime': get_uptime(),
             'python_version': f"{sys.version.split()[0]}",
-            'processes': len(psutil.pids())
+            'processes': count_processes()
         }
+        _system_stats_cache['timestamp'] = now
+        _system_stats_cache['data'] = stats
+        return stats
     except Exception as e:
         current_app.logger.error(f"Error getting system stats: {e}")
         return {
@@ -131,7 +166,16 @@ def get_system_stats():
         }
 
 
-def get_processing_stats():
+def count_processes():
+    """Count running processes, scanning /proc directly where available"""
+    try:
+        with os.scandir('/proc') as entries:
+            return sum(1 for entry in entries if entry.name.isdigit())
+    except OSError:
+        return len(psutil.pids())
+
+
+def get_processing_stats(snapshot=None):
     """Get email processing statistics"""
     fallback_stats = {
         'total_processed_today': 0,
@@ -144,42 +188,41 @@ def get_processing_stats():
     }
     
     try:
-        # Import here to avoid circular imports
-        from services.task_manager import get_task_manager
-        
-        task_manager = get_task_manager()
-        if not task_manager:
-            current_app.logger.warning("Task manager not available")
+        if snapshot is None:
+            snapshot = get_dashboard_snapshot()
+        if snapshot is None:
             return fallback_stats
             
-        aggregate_stats = task_manager.get_aggregate_stats()
+        aggregate_stats = snapshot['aggregate']
         if not aggregate_stats:
             current_app.logger.warning("Aggregate stats not available")
             return fallback_stats
         
-        # Get most recent last_run timestamp from all accounts
-        from datetime import datetime
+        # Get most recent last_run timestamp from all accounts. last_run values are
+        # naive ISO-8601 strings, which sort chronologically, so compare them as
+        # strings and only parse the most recent valid one.
         most_recent_run = None
         
         try:
-            all_status = task_manager.get_all_status()
+            all_status = snapshot['all_status']
             if all_status and 'accounts' in all_status:
-                for account_email, account_status in all_status['accounts'].items():
-                    if account_status and 'stats' in account_status:
-                        last_run_str = account_status['stats'].get('last_run')
-                        if last_run_str:
-                            try:
-                                last_run = datetime.fromisoformat(last_run_str)
-                                if most_recent_run is None or last_run > most_recent_run:
-                                    most_recent_run = last_run
-                            except (ValueError, TypeError):
-                                continue
+                last_runs = [
+                    account_status['stats'].get('last_run')
+                    for account_status in all_status['accounts'].values()
+                    if account_status and account_status.get('stats')
+                ]
+                for last_run_str in sorted(filter(None, last_runs), reverse=True):
+                    try:
+                        most_recent_run = format_iso_timestamp(last_run_str, '%Y-%m-%d %H:%M:%S')
+                        break
+                    except (ValueError, TypeError):
+                        continue
         except Exception as e:
             current_app.logger.warning(f"Error getting last run times: {e}")
         
         # Format last_run for display
         if most_recent_run:
-            last_run_display = most_recent_run.strftime('%Y-%m-%d %H:%M:%S')
+            last_run_display = most_recent_run
         elif aggregate_stats.get('running_accounts', 0) > 0:
             last_run_display = 'Active'
         else:
@@ -218,9 +261,7 @@ def get_list_stats():
         for list_name, list_path in config.list_files.items():
             try:
                 if list_path.exists():
-                    with open(list_path, 'r') as f:
-                        lines = [line.strip() for line in f.readlines() if line.strip()]
-                        stats[list_name] = len(lines)
+                    stats[list_name] = count_list_entries(list_path)
                 else:
                     stats[list_name] = 0
             except Exception:
@@ -232,8 +273,21 @@ def get_list_stats():
         return {}
 
 
-def get_account_stats():
+def get_account_stats(snapshot=None):
     """Get email account statistics"""
+    return collect_account_view(snapshot)[0]
+
+
+def collect_account_view(snapshot=None):
+    """
+    Build the account summary counters and the account table rows in one pass
+    
+    Args:
+        snapshot: Task manager snapshot, fetched if not provided
+        
+    Returns:
+        tuple: (account stats dict, list of account detail dicts)
+    """
     fallback_stats = {
         'total_accounts': 0,
         'active_accounts': 0,
@@ -243,40 +297,74 @@ def get_account_stats():
     }
     
     try:
-        # Import here to avoid circular imports
-        from services.task_manager import get_task_manager
+        if snapshot is None:
+            snapshot = get_dashboard_snapshot()
+        aggregate_stats = snapshot['aggregate'] if snapshot else None
+        system_status = snapshot['all_status'] if snapshot else None
+        accounts_status = system_status.get('accounts') if system_status else None
         
-        task_manager = get_task_manager()
-        if not task_manager:
-            current_app.logger.warning("Task manager not available for account stats")
-            return fallback_stats
+        # Walk the task manager status once for both the counters and the table rows
+        error_accounts = 0
+        account_names = []
+        status_rows = {}
+        
+        for account_email, account_status in (accounts_status or {}).items():
+            account_names.append(account_email)
+            if not account_status:
+                continue
+            
+            # Map state to status
+            state = account_status.get('state', 'stopped')
+            if state in ['running_startup', 'running_maintenance', 'starting']:
+                status = 'running'
+            elif state == 'error':
+                status = 'error'
+                error_accounts += 1
+            else:
+                status = 'stopped'
+            
+            row = {
+                'status': status,
+                'mode': account_status.get('mode', 'unknown')
+            }
             
-        aggregate_stats = task_manager.get_aggregate_stats()
-        system_status = task_manager.get_all_status()
+            # Get last run time from stats
+            if account_status.get('stats'):
+                last_run_str = account_status['stats'].get('last_run')
+                if last_run_str:
+                    try:
+                        row['last_run'] = format_iso_timestamp(last_run_str, '%Y-%m-%d %H:%M')
+                    except (ValueError, TypeError):
+                        pass
+            
+            status_rows[account_email] = row
+        
+        # Account table rows come from config, overlaid with task manager status
+        config_accounts = current_app.mail_config.accounts
+        accounts_list = []
+        for account in config_accounts:
+            account_dict = {
+                'name': account.name,
+                'email': account.email,
+                'server': account.server,
+                'status': 'stopped',
+                'mode': 'unknown',
+                'last_run': None
+            }
+            account_dict.update(status_rows.get(account.email, {}))
+            accounts_list.append(account_dict)
         
         if not aggregate_stats:
             current_app.logger.warning("Aggregate stats not available for account stats")
-            return fallback_stats
-            
-        total_accounts = aggregate_stats.get('total_accounts', 0)
-        running_accounts = aggregate_stats.get('running_accounts', 0)
+            return fallback_stats, accounts_list
         
-        # Count error accounts
-        error_accounts = 0
-        account_names = []
-        
-        if system_status and 'accounts' in system_status:
-            for account_email, account_status in system_status['accounts'].items():
-                account_names.append(account_email)
-                if account_status and account_status.get('state') == 'error':
-                    error_accounts += 1
+        running_accounts = aggregate_stats.get('running_accounts', 0)
         
         # Use config-based count for consistency with template
-        from flask import current_app
-        config_account_count = len(current_app.mail_config.accounts)
+        config_account_count = len(config_accounts)
         
         stats = {
-            'total_accounts': total_accounts,
+            'total_accounts': aggregate_stats.get('total_accounts', 0),
             'active_accounts': config_account_count,  # Consistent with template account_count
             'running_accounts': running_accounts,  # Processors currently running
             'inactive_accounts': max(0, config_account_count - running_accounts - error_accounts),
@@ -285,25 +373,29 @@ def get_account_stats():
         }
         
         current_app.logger.debug(f"Account stats retrieved successfully: {stats}")
-        return stats
+        return stats, accounts_list
         
     except Exception as e:
-        current_app.logger.error(f"Error getting account stats: {e}", exc_info=True)
-        return fallback_stats
+        current_app.logger.error(f"Error getting account view: {e}", exc_info=True)
+        return fallback_stats, []
 
 
-def get_recent_activity():
+def get_recent_activity(snapshot=None):
     """Get recent system activity"""
+    global _activity_cache
     try:
-        # Import here to avoid circular imports
-        from services.task_manager import get_task_manager
-        
-        task_manager = get_task_manager()
-        if not task_manager:
-            current_app.logger.warning("Task manager not available for recent activity")
+        if snapshot is None:
+            snapshot = get_dashboard_snapshot()
+        if snapshot is None:
             return []
             
-        task_history = task_manager.get_task_history(limit=10)
+        # History versions restart with the task manager, so key on its startup time too
+        cache_key = (snapshot['all_status']['task_manager']['startup_time'], snapshot['history_version'])
+        cached_key, cached_activities = _activity_cache
+        if cached_key == cache_key:
+            return cached_activities
+        
+        task_history = snapshot['task_history']
         if not task_history:
             current_app.logger.debug("No task history available")
             return []
@@ -325,6 +417,7 @@ def get_recent_activity():
                 continue
         
         current_app.logger.debug(f"Retrieved {len(activities)} recent activities")
+        _activity_cache = (cache_key, activities)
         return activities
         
     except Exception as e:
@@ -332,45 +425,38 @@ def get_recent_activity():
         return []
 
 
+# Human-readable messages for task history entries, keyed by task type
+ACTIVITY_MESSAGES = {
+    'account_added': lambda d: f"Added account {d.get('account', 'unknown')}",
+    'account_removed': lambda d: f"Removed account {d.get('account', 'unknown')}",
+    'service_started': lambda d: f"Started {d.get('mode', 'unknown')} processing for {d.get('account', 'unknown')}",
+    'service_stopped': lambda d: f"Stopped processing for {d.get('account', 'unknown')}",
+    'service_restarted': lambda d: f"Restarted processing for {d.get('account', 'unknown')}",
+    'mode_switched': lambda d: f"Switched {d.get('account', 'unknown')} to {d.get('new_mode', 'unknown')} mode",
+    'auto_transition': lambda d: f"Auto-transitioned {d.get('account', 'unknown')} to {d.get('to_mode', 'unknown')} mode",
+}
+
+# Activity status for task types; anything not listed is 'info'
+ACTIVITY_STATUSES = {
+    'service_started': 'success',
+    'account_added': 'success',
+    'auto_transition': 'success',
+    'mode_switched': 'success',
+}
+
+
 def get_activity_message(task):
     """Convert task history entry to human-readable message"""
     task_type = task['type']
-    details = task.get('details', {})
-    
-    if task_type == 'account_added':
-        return f"Added account {details.get('account', 'unknown')}"
-    elif task_type == 'account_removed':
-        return f"Removed account {details.get('account', 'unknown')}"
-    elif task_type == 'service_started':
-        account = details.get('account', 'unknown')
-        mode = details.get('mode', 'unknown')
-        return f"Started {mode} processing for {account}"
-    elif task_type == 'service_stopped':
-        return f"Stopped processing for {details.get('account', 'unknown')}"
-    elif task_type == 'service_restarted':
-        return f"Restarted processing for {details.get('account', 'unknown')}"
-    elif task_type == 'mode_switched':
-        account = details.get('account', 'unknown')
-        new_mode = details.get('new_mode', 'unknown')
-        return f"Switched {account} to {new_mode} mode"
-    elif task_type == 'auto_transition':
-        account = details.get('account', 'unknown')
-        to_mode = details.get('to_mode', 'unknown')
-        return f"Auto-transitioned {account} to {to_mode} mode"
-    else:
+    message = ACTIVITY_MESSAGES.get(task_type)
+    if message is None:
         return f"Task: {task_type}"
+    return message(task.get('details', {}))
 
 
 def get_activity_status(task_type):
     """Get activity status based on task type"""
-    if task_type in ['service_started', 'account_added', 'auto_transition', 'mode_switched']:
-        return 'success'
-    elif task_type in ['service_stopped', 'account_removed']:
-        return 'info'
-    elif task_type == 'service_restarted':
-        return 'info'
-    else:
-        return 'info'
+    return ACTIVITY_STATUSES.get(task_type, 'info')
 
 
 def get_recent_logs():
@@ -400,12 +486,12 @@ def get_uptime():
         return "Unknown"
 
 
-def get_service_info():
+def get_service_info(snapshot=None):
     """Get service mode and status information"""
     try:
-        from services.task_manager import get_task_manager
-        task_manager = get_task_manager()
-        status = task_manager.get_all_status()
+        if snapshot is None:
+            snapshot = get_dashboard_snapshot()
+        status = snapshot['all_status'] if snapshot else None
         
         # Determine overall service mode
         modes = []
@@ -456,62 +542,6 @@ def get_service_info():
         }
 
 
-def get_account_details():
+def get_account_details(snapshot=None):
     """Get detailed account information for dashboard table"""
-    try:
-        from services.task_manager import get_task_manager
-
-        task_manager = get_task_manager()
-        config = current_app.mail_config
-
-        accounts_list = []
-
-        # Get accounts from config
-        for account in config.accounts:
-            account_dict = {
-                'name': account.name,
-                'email': account.email,
-                'server': account.server,
-                'status': 'stopped',
-                'mode': 'unknown',
-                'last_run': None
-            }
-
-            # Get status from task manager if available
-            if task_manager:
-                try:
-                    status = task_manager.get_all_status()
-                    if status and 'accounts' in status and account.email in status['accounts']:
-                        account_status = status['accounts'][account.email]
-                        if account_status:
-                            # Map state to status
-                            state = account_status.get('state', 'stopped')
-                            if state in ['running_startup', 'running_maintenance', 'starting']:
-                                account_dict['status'] = 'running'
-                            elif state == 'error':
-                                account_dict['status'] = 'error'
-                            else:
-                                account_dict['status'] = 'stopped'
-
-                            # Get mode
-                            account_dict['mode'] = account_status.get('mode', 'unknown')
-
-                            # Get last run time from stats
-                            if 'stats' in account_status and account_status['stats']:
-                                last_run_str = account_status['stats'].get('last_run')
-                                if last_run_str:
-                                    try:
-                                        last_run = datetime.fromisoformat(last_run_str)
-                                        account_dict['last_run'] = last_run.strftime('%Y-%m-%d %H:%M')
-                                    except (ValueError, TypeError):
-                                        pass
-                except Exception as e:
-                    current_app.logger.warning(f"Error getting status for {account.email}: {e}")
-
-            accounts_list.append(account_dict)
-
-        return accounts_list
-
-    except Exception as e:
-        current_app.logger.error(f"Error getting account details: {e}", exc_info=True)
-        return []
\ No newline at end of file
+    return collect_account_view(snapshot)[1]
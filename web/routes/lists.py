@@ -17,19 +17,37 @@ List management routes for Mail-Rulez web interface
 Handles dynamic list management with drag-and-drop support and conflict resolution.
 """
 
+import hashlib
 import os
+import re
 import sys
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
 from pathlib import Path
 from flask import Blueprint, render_template, redirect, url_for, flash, current_app, request, jsonify
-from functools import wraps
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+# Add parent directory to path for imports (only once, so entries don't pile up)
+_parent_dir = str(Path(__file__).parent.parent.parent)
+if _parent_dir not in sys.path:
+    sys.path.insert(0, _parent_dir)
 import functions as pf
+from web.json_utils import json_response
+from web.auth_utils import login_required
 
 
 lists_bp = Blueprint('lists', __name__)
 
+# Basic email shape check: one @, no whitespace, a dot in the domain part
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Parsed list files keyed by path: (st_mtime_ns, st_size, entries, entry_set)
+_list_cache = {}
+
+# Shared pool for reading list files concurrently (reads release the GIL)
+_list_read_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='list-read')
+
 
 @lists_bp.route('/api/test')
 def api_test():
@@ -37,16 +55,6 @@ def api_test():
     return jsonify({'success': True, 'message': 'API is working'})
 
 
-def login_required(f):
-    """Decorator to require authentication for routes"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not current_app.get_current_user():
-            return redirect(url_for('auth.login', next=request.url))
-        return f(*args, **kwargs)
-    return decorated_function
-
-
 @lists_bp.route('/')
 @login_required
 def manage_lists():
@@ -67,34 +75,38 @@ def api_get_all_data():
     try:
         config = current_app.mail_config
         all_lists = config.get_all_lists()
+        
+        # Answer 304 Not Modified while no list file has changed
+        etag = list_files_etag(all_lists)
+        if request.if_none_match.contains(etag):
+            return conditional_response(current_app.response_class(status=304), etag)
+        
         metadata = config.get_list_metadata()
         
         # Load list contents
         list_data = {}
-        for list_name, list_path in all_lists.items():
-            try:
-                entries = pf.open_read(str(list_path))
-                # Filter out empty/whitespace-only entries
-                filtered_entries = [e.strip() for e in entries if e.strip()]
-                list_data[list_name] = {
-                    'entries': filtered_entries,
-                    'metadata': metadata[list_name]
-                }
-            except Exception as e:
-                current_app.logger.error(f"Error loading list {list_name}: {e}")
-                list_data[list_name] = {
-                    'entries': [],
-                    'metadata': metadata[list_name]
-                }
+        list_sets = {}
+        for list_name, result in load_all_lists(all_lists):
+            if isinstance(result, Exception):
+                current_app.logger.error(f"Error loading list {list_name}: {result}")
+                entries, entry_set = [], frozenset()
+            else:
+                entries, entry_set = result
+            list_data[list_name] = {
+                'entries': entries,
+                'metadata': metadata[list_name]
+            }
+            list_sets[list_name] = entry_set
         
         # Detect conflicts
-        conflicts = detect_conflicts(list_data)
+        conflicts = detect_conflicts(list_sets)
         
-        return jsonify({
+        response = json_response({
             'success': True,
             'lists': list_data,
             'conflicts': conflicts
         })
+        return conditional_response(response, etag)
         
     except Exception as e:
         current_app.logger.error(f"Error in api_get_all_data: {e}")
@@ -116,7 +128,7 @@ def api_add_entry(list_name):
             return jsonify({'success': False, 'error': 'Email address required'}), 400
         
         # Validate email format (basic)
-        if '@' not in email or '.' not in email:
+        if not EMAIL_RE.match(email):
             return jsonify({'success': False, 'error': 'Invalid email format'}), 400
         
         config = current_app.mail_config
@@ -125,21 +137,10 @@ def api_add_entry(list_name):
         if list_name not in all_lists:
             return jsonify({'success': False, 'error': f'List {list_name} not found'}), 404
         
-        # Add to list using existing function
-        list_path = str(all_lists[list_name])
-        
-        # Check if already exists
-        existing_entries = pf.open_read(list_path)
-        if email in existing_entries:
+        # Add entry unless it already exists (blank lines are cleaned up in the same pass)
+        if not append_list_entry(all_lists[list_name], email):
             return jsonify({'success': False, 'error': 'Email already in list'}), 400
         
-        # Add entry
-        with open(list_path, 'a') as f:
-            f.write(f'{email}\n')
-        
-        # Clean up blanks
-        pf.rm_blanks(list_path)
-        
         return jsonify({
             'success': True,
             'message': f'Added {email} to {list_name}'
@@ -170,8 +171,8 @@ def api_remove_entry(list_name):
         if list_name not in all_lists:
             return jsonify({'success': False, 'error': f'List {list_name} not found'}), 404
         
-        # Remove from list using existing function
-        pf.remove_entry(email, str(all_lists[list_name]))
+        # Remove from list
+        remove_list_entry(all_lists[list_name], email)
         
         return jsonify({
             'success': True,
@@ -205,16 +206,16 @@ def api_move_entry():
         if from_list not in all_lists or to_list not in all_lists:
             return jsonify({'success': False, 'error': 'Invalid list names'}), 404
         
-        # Remove from source list
-        pf.remove_entry(email, str(all_lists[from_list]))
-        
-        # Add to destination list
-        with open(str(all_lists[to_list]), 'a') as f:
-            f.write(f'{email}\n')
+        # Entries already in the source list move as they are (lists may hold
+        # older entries that predate the format check); anything else would
+        # be a new entry in the destination, so it must look like an email
+        if email not in load_list_entries(all_lists[from_list])[1] and not EMAIL_RE.match(email):
+            return jsonify({'success': False, 'error': 'Invalid email format'}), 400
         
-        # Clean up both lists
-        pf.rm_blanks(str(all_lists[from_list]))
-        pf.rm_blanks(str(all_lists[to_list]))
+        # Remove from source list, then add to destination list. Each list is
+        # read and written at most once, with blank lines dropped on the way.
+        remove_list_entry(all_lists[from_list], email)
+        append_list_entry(all_lists[to_list], email)
         
         return jsonify({
             'success': True,
@@ -238,17 +239,13 @@ def api_get_conflicts():
         all_lists = config.get_all_lists()
         
         # Load list contents
-        list_data = {}
-        for list_name, list_path in all_lists.items():
-            try:
-                entries = pf.open_read(str(list_path))
-                list_data[list_name] = {'entries': entries}
-            except Exception:
-                list_data[list_name] = {'entries': []}
+        list_sets = {}
+        for list_name, result in load_all_lists(all_lists):
+            list_sets[list_name] = frozenset() if isinstance(result, Exception) else result[1]
         
-        conflicts = detect_conflicts(list_data)
+        conflicts = detect_conflicts(list_sets)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'conflicts': conflicts
         })
@@ -261,23 +258,171 @@ def api_get_conflicts():
         }), 500
 
 
-def detect_conflicts(list_data):
-    """Detect conflicts between all lists"""
-    conflicts = {}
-    list_names = list(list_data.keys())
+def conditional_response(response, etag):
+    """Tag a list data response, keeping it out of shared caches"""
+    response.set_etag(etag)
+    # Per-user data: browsers must revalidate, and proxies must not store it
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def list_files_etag(all_lists):
+    """
+    Build an ETag for the current state of all list files
     
-    # Compare each pair of lists
-    for i, list1 in enumerate(list_names):
-        for list2 in list_names[i+1:]:
-            entries1 = set(list_data[list1]['entries'])
-            entries2 = set(list_data[list2]['entries'])
-            
-            common = entries1.intersection(entries2)
-            if common:
-                conflict_key = f"{list1}_vs_{list2}"
-                conflicts[conflict_key] = {
-                    'lists': [list1, list2],
-                    'emails': list(common)
-                }
+    Derived from each list's name, path, mtime and size, so it changes
+    whenever a list is added, removed or modified.
+    """
+    state = []
+    for list_name, list_path in all_lists.items():
+        try:
+            st = os.stat(list_path)
+            state.append((list_name, str(list_path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            state.append((list_name, str(list_path), None, None))
+    return hashlib.sha1(repr(state).encode('utf-8')).hexdigest()
+
+
+def load_list_entries(list_path):
+    """
+    Get the non-blank, stripped entries of a list file and their frozenset
+    
+    Parsed files are cached on (mtime, size), so unchanged lists cost a
+    single stat() call. Callers that modify a list drop its cache entry.
+    """
+    key = str(list_path)
+    st = os.stat(key)
+    cached = _list_cache.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2], cached[3]
+    
+    entries = [e.strip() for e in pf.open_read(key) if e.strip()]
+    entry_set = frozenset(entries)
+    _list_cache[key] = (st.st_mtime_ns, st.st_size, entries, entry_set)
+    return entries, entry_set
+
+
+def write_list_file(list_path, lines):
+    """Atomically replace a list file with the given lines"""
+    list_path = str(list_path)
+    mode = os.stat(list_path).st_mode
+    
+    # Write to a temp file in the same directory, then rename over the list
+    temp_fd, temp_file = tempfile.mkstemp(
+        suffix='.tmp',
+        prefix='list_',
+        dir=os.path.dirname(list_path)
+    )
+    try:
+        with os.fdopen(temp_fd, 'w') as f:
+            f.writelines(lines)
+        os.chmod(temp_file, mode & 0o777)
+        os.replace(temp_file, list_path)
+    except Exception:
+        if os.path.exists(temp_file):
+            os.unlink(temp_file)
+        raise
+
+
+def append_list_entry(list_path, email):
+    """
+    Add an email to a list file, dropping any blank lines
+    
+    The file is streamed once, stopping at the first duplicate. A plain
+    append is used when the file is already clean; otherwise it is
+    rewritten in a single pass.
+    
+    Returns:
+        bool: False if the email was already in the list
+    """
+    clean = True
+    ends_with_newline = True
+    with open(list_path, 'r') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.lower() == email:
+                return False
+            if not stripped:
+                clean = False
+            ends_with_newline = line.endswith('\n')
+    
+    if clean and ends_with_newline:
+        # Unbuffered binary append: one write() call, no text/buffer layers
+        with open(list_path, 'ab', buffering=0) as f:
+            f.write(f'{email}\n'.encode('utf-8'))
+    else:
+        with open(list_path, 'r') as f:
+            lines = [f'{line.strip()}\n' for line in f if line.strip()]
+        write_list_file(list_path, lines + [f'{email}\n'])
+    
+    _list_cache.pop(str(list_path), None)
+    return True
+
+
+def remove_list_entry(list_path, email):
+    """Remove an email from a list file, dropping any blank lines"""
+    with open(list_path, 'r') as f:
+        lines = f.readlines()
+    
+    kept = [line for line in lines if line.strip() and line.strip() != email]
+    if len(kept) != len(lines):
+        write_list_file(list_path, kept)
+        _list_cache.pop(str(list_path), None)
+
+
+def load_all_lists(all_lists):
+    """
+    Load every list file, overlapping the reads on a small thread pool
+    
+    Returns:
+        list: (list_name, (entries, entry_set)) pairs in list order; the
+        second item is the exception instead if a list failed to load
+    """
+    def load(item):
+        list_name, list_path = item
+        try:
+            return list_name, load_list_entries(list_path)
+        except Exception as e:
+            return list_name, e
+    
+    return list(_list_read_pool.map(load, all_lists.items()))
+
+
+def detect_conflicts(list_sets):
+    """Detect conflicts between all lists
+    
+    Finds the emails present in more than one list with C-level set
+    operations, then builds an email -> lists index for just those emails
+    and reports every pair of lists that share an email.
+    
+    Args:
+        list_sets: Dict mapping list name to a set of its entries
+    """
+    seen = set()
+    shared = set()
+    for entries in list_sets.values():
+        shared |= seen.intersection(entries)
+        seen |= entries
+    
+    if not shared:
+        return {}
+    
+    email_lists = defaultdict(list)
+    for list_name, entries in list_sets.items():
+        for email in shared.intersection(entries):
+            email_lists[email].append(list_name)
+    
+    conflicts = {}
+    for email, names in email_lists.items():
+        if len(names) < 2:
+            continue
+        # Sorted names give each pair one canonical key regardless of list order
+        for list1, list2 in combinations(sorted(names), 2):
+            conflict = conflicts.setdefault(f"{list1}_vs_{list2}", {
+                'lists': [list1, list2],
+                'emails': []
+            })
+            conflict['emails'].append(email)
     
-    return conflicts
\ No newline at end of file
+    return conflicts
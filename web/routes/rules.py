@@ -17,71 +17,185 @@ Rules management routes for Mail-Rulez web interface
 Handles custom email processing rules configuration.
 """
 
+import hashlib
+import os
+import re
 import sys
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from flask import Blueprint, render_template, redirect, url_for, flash, current_app, request, jsonify
+from flask import Blueprint, render_template, stream_template, redirect, url_for, flash, current_app, request, make_response, session
 from flask_wtf import FlaskForm
 from wtforms import StringField, TextAreaField, SelectField, BooleanField, IntegerField, SubmitField, FieldList, FormField
 from wtforms.validators import DataRequired, Length, NumberRange
-from functools import wraps
 from datetime import datetime
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+# Add parent directory to path for imports (only once, so entries don't pile up)
+_parent_dir = str(Path(__file__).parent.parent.parent)
+if _parent_dir not in sys.path:
+    sys.path.insert(0, _parent_dir)
+from config import Config
 from rules import RulesEngine, EmailRule, RuleCondition, RuleAction, ConditionType, ActionType, RULE_TEMPLATES, create_rule_from_template
+from web.auth_utils import login_required
+from web.json_utils import dumps, loads, json_response
 
 
 rules_bp = Blueprint('rules', __name__)
 
+# Submitted type values -> enum members, looked up without Enum.__call__
+CONDITION_TYPES = {member.value: member for member in ConditionType}
+ACTION_TYPES = {member.value: member for member in ActionType}
 
-def login_required(f):
-    """Decorator to require authentication for routes"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not current_app.get_current_user():
-            return redirect(url_for('auth.login', next=request.url))
-        return f(*args, **kwargs)
-    return decorated_function
+# Action types whose target is a list file that must exist
+LIST_FILE_ACTIONS = frozenset({ActionType.ADD_TO_LIST, ActionType.CREATE_LIST})
+
+# Indexed rule form fields, e.g. conditions-0-type or actions-2-target
+FORM_ROW_RE = re.compile(r'^(conditions|actions)-(\d+)-(.+)$')
+
+# Upper bound on condition/action rows accepted from one rule form
+MAX_FORM_ROWS = {'conditions': 50, 'actions': 50}
+
+# Characters not allowed in folder names used by move-to-folder actions
+INVALID_FOLDER_CHARS = frozenset('<>:"|?*')
+
+# Loaded rules engines keyed by rules file: (st_mtime_ns, st_size, engine)
+_rules_engines = {}
+_rules_engines_lock = threading.Lock()
+
+# Serializes rule edits (load, change, save) so concurrent edits can't interleave
+_rules_write_lock = threading.Lock()
+
+# Serialized /api/templates response body, built on first request
+_templates_body = None
+
+# Saved accounts keyed by config file: ((secure config stamp, config stamp), accounts)
+_saved_accounts = {}
 
 
 def get_rules_engine():
-    """Get the rules engine instance - always reload to ensure fresh data"""
-    # Always create a fresh instance to avoid caching stale rules
-    # This ensures the web interface always shows the current state
+    """
+    Get the rules engine instance for the configured rules file
+    
+    The engine is cached and only reloaded when rules.json changes on disk
+    (e.g. edited by the email processor or another worker), so the web
+    interface always shows the current state without re-parsing the file
+    on every request.
+    """
+    rules_file = current_app.mail_config.config_dir / 'rules.json'
+    stamp = file_stamp(rules_file)
+    key = str(rules_file)
+    with _rules_engines_lock:
+        cached = _rules_engines.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        
+        engine = RulesEngine(rules_file)
+        _rules_engines[key] = (stamp, engine)
+        return engine
+
+
+@contextmanager
+def editing_rules_engine():
+    """
+    Get a freshly loaded rules engine to change and save, one writer at a time
+    
+    The cached engine from get_rules_engine() is shared by all request
+    threads and only ever read. Edits go to a private engine loaded from
+    disk under _rules_write_lock, so a failed save leaves nothing unsaved
+    behind in the cache and two edits can't overwrite each other.
+    """
     rules_file = current_app.mail_config.config_dir / 'rules.json'
-    return RulesEngine(rules_file)
+    with _rules_write_lock:
+        try:
+            yield RulesEngine(rules_file)
+        finally:
+            invalidate_rules_engine()
+
+
+def invalidate_rules_engine():
+    """Drop the cached rules engine so the next request reloads it from disk"""
+    rules_file = current_app.mail_config.config_dir / 'rules.json'
+    with _rules_engines_lock:
+        _rules_engines.pop(str(rules_file), None)
+
+
+def file_stamp(path):
+    """Get (mtime, size) of a file, or None if it does not exist"""
+    try:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+
+def get_saved_accounts():
+    """
+    Get the accounts as currently saved in the config files
+    
+    Accounts may be saved by another worker, so the config is re-read, but
+    only when secure_config.json or the config file changed since the last
+    load; otherwise the previously loaded accounts are reused.
+    """
+    mail_config = current_app.mail_config
+    stamps = (file_stamp(mail_config.secure_config_file), file_stamp(mail_config.config_file))
+    key = str(mail_config.config_file)
+    
+    cached = _saved_accounts.get(key)
+    if cached and cached[0] == stamps:
+        return cached[1]
+    
+    fresh_config = Config(mail_config.base_dir, mail_config.config_file, mail_config.use_encryption)
+    _saved_accounts[key] = (stamps, fresh_config.accounts)
+    return fresh_config.accounts
+
+
+def list_file_names(actions):
+    """Get the unique list file names targeted by list actions, with a .txt suffix"""
+    return frozenset(
+        target if target.endswith('.txt') else f"{target}.txt"
+        for action_type, target in actions
+        if action_type in LIST_FILE_ACTIONS
+    )
+
+
+# List files each built-in template writes to, worked out once at import
+TEMPLATE_LIST_FILES = {
+    name: list_file_names((action['type'], action['target']) for action in template['actions'])
+    for name, template in RULE_TEMPLATES.items()
+}
 
 
 def ensure_list_files_exist(rule):
     """Ensure list files referenced in rule actions are created"""
-    config = current_app.mail_config
-    
-    for action in rule.actions:
-        if action.type == ActionType.ADD_TO_LIST:
-            list_filename = action.target
-            
-            # If target doesn't end with .txt, add it
-            if not list_filename.endswith('.txt'):
-                list_filename = f"{list_filename}.txt"
-            
-            # Create the list file if it doesn't exist
-            list_path = config.lists_dir / list_filename
-            if not list_path.exists():
-                try:
-                    list_path.touch()
-                    current_app.logger.info(f"Created list file: {list_path}")
-                except Exception as e:
-                    current_app.logger.error(f"Failed to create list file {list_path}: {e}")
+    create_list_files(list_file_names((action.type, action.target) for action in rule.actions))
 
 
-def validate_rule(rule, exclude_rule_id=None):
+def create_list_files(list_filenames):
+    """Create any of the given list files that don't exist yet"""
+    config = current_app.mail_config
+    
+    for list_filename in list_filenames:
+        # Create the list file if it doesn't exist (one exclusive-create call)
+        list_path = config.lists_dir / list_filename
+        try:
+            os.close(os.open(list_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+            current_app.logger.info(f"Created list file: {list_path}")
+        except FileExistsError:
+            pass
+        except Exception as e:
+            current_app.logger.error(f"Failed to create list file {list_path}: {e}")
+
+
+def validate_rule(rule, exclude_rule_id=None, rules_engine=None):
     """
     Validate rule for common issues
     
     Args:
         rule: EmailRule object to validate
         exclude_rule_id: Rule ID to exclude from duplicate name check (for updates)
+        rules_engine: Engine the caller already holds (defaults to get_rules_engine())
         
     Returns:
         tuple: (is_valid: bool, errors: list)
@@ -89,16 +203,28 @@ def validate_rule(rule, exclude_rule_id=None):
     errors = []
     
     # Check for duplicate rule names
-    rules_engine = get_rules_engine()
-    existing_rules = rules_engine.get_all_rules()
-    for existing_rule in existing_rules:
-        if existing_rule.id != exclude_rule_id and existing_rule.name.lower() == rule.name.lower():
-            errors.append(f"A rule with the name '{rule.name}' already exists")
-            break
+    if rules_engine is None:
+        rules_engine = get_rules_engine()
+    if any(rule_id != exclude_rule_id for rule_id in rules_engine.get_rule_ids_by_name(rule.name)):
+        errors.append(f"A rule with the name '{rule.name}' already exists")
     
     # Validate folder actions
     config = current_app.mail_config
-    accounts = config.accounts
+    
+    # If rule is account-specific, collect that account's folder structure once:
+    # configured folders match exactly or as parents of sub-folders
+    folder_exacts = None
+    if rule.account_email:
+        target_account = config.get_account_by_email(rule.account_email)
+        
+        if target_account and target_account.folders:
+            folder_bases = tuple(folder for folder in target_account.folders.values() if folder)
+            folder_exacts = frozenset(folder_bases)
+            folder_prefixes = (
+                tuple(f"{folder}." for folder in folder_bases) +
+                tuple(f"{folder}/" for folder in folder_bases) +
+                ('INBOX',)
+            )
     
     for action in rule.actions:
         if action.type == ActionType.MOVE_TO_FOLDER:
@@ -110,65 +236,117 @@ def validate_rule(rule, exclude_rule_id=None):
                 continue
                 
             # Check for invalid characters
-            invalid_chars = ['<', '>', ':', '"', '|', '?', '*']
-            if any(char in folder_name for char in invalid_chars):
+            if not INVALID_FOLDER_CHARS.isdisjoint(folder_name):
                 errors.append(f"Folder name '{folder_name}' contains invalid characters")
                 continue
             
-            # If rule is account-specific, validate folder exists in that account's configuration
-            if rule.account_email:
-                target_account = None
-                for account in accounts:
-                    if account.email == rule.account_email:
-                        target_account = account
-                        break
-                
-                if target_account and target_account.folders:
-                    # Check if folder follows the account's folder structure
-                    folder_values = list(target_account.folders.values())
-                    folder_pattern_valid = False
-                    
-                    # Check if it matches existing folder patterns or is a sub-folder
-                    for existing_folder in folder_values:
-                        if existing_folder and (
-                            folder_name == existing_folder or 
-                            folder_name.startswith(existing_folder + '.') or
-                            folder_name.startswith(existing_folder + '/') or
-                            folder_name.startswith('INBOX.')
-                        ):
-                            folder_pattern_valid = True
-                            break
-                    
-                    if not folder_pattern_valid and not folder_name.startswith('INBOX'):
-                        errors.append(f"Folder '{folder_name}' does not follow the account's folder structure. Consider using a folder like 'INBOX.{folder_name.replace('INBOX.', '')}'")
+            # Check if folder follows the account's folder structure
+            if folder_exacts is not None:
+                if folder_name not in folder_exacts and not folder_name.startswith(folder_prefixes):
+                    errors.append(f"Folder '{folder_name}' does not follow the account's folder structure. Consider using a folder like 'INBOX.{folder_name.replace('INBOX.', '')}'")
     
     return len(errors) == 0, errors
 
 
+def type_member(types, value):
+    """Map a submitted condition/action type value to its enum member"""
+    try:
+        return types[value]
+    except KeyError:
+        raise ValueError(f"Unknown type: {value}") from None
+
+
+def parse_form_rows(form):
+    """
+    Group indexed rule form fields (conditions-0-type, actions-1-target, ...)
+    
+    Makes a single pass over the form keys.
+    
+    Returns:
+        dict: {'conditions': [...], 'actions': [...]}, each a list of
+        {field: value} dicts ordered by row index
+    
+    Raises:
+        ValueError: If the form has more rows than MAX_FORM_ROWS allows
+    """
+    groups = {'conditions': {}, 'actions': {}}
+    for key, value in form.items():
+        match = FORM_ROW_RE.match(key)
+        if match:
+            prefix, index, field = match.groups()
+            rows = groups[prefix]
+            index = int(index)
+            if index not in rows and len(rows) >= MAX_FORM_ROWS[prefix]:
+                raise ValueError(f"A rule can have at most {MAX_FORM_ROWS[prefix]} {prefix}")
+            rows.setdefault(index, {})[field] = value
+    
+    return {prefix: [rows[index] for index in sorted(rows)] for prefix, rows in groups.items()}
+
+
+def parse_conditions(rows):
+    """Build RuleConditions from parsed condition form rows, skipping incomplete ones"""
+    return [
+        RuleCondition(
+            type=type_member(CONDITION_TYPES, row['type']),
+            value=row['value'],
+            case_sensitive='case_sensitive' in row
+        )
+        for row in rows
+        if row.get('type') and row.get('value')
+    ]
+
+
+def parse_actions(rows):
+    """Build RuleActions from parsed action form rows, skipping incomplete ones"""
+    actions = []
+    for row in rows:
+        if not (row.get('type') and row.get('target')):
+            continue
+        
+        # Convert retention parameters to integers if provided
+        retention_days = row.get('retention_days', '').strip()
+        trash_retention_days = row.get('trash_retention_days', '').strip()
+        
+        actions.append(RuleAction(
+            type=type_member(ACTION_TYPES, row['type']),
+            target=row['target'],
+            retention_days=int(retention_days) if retention_days else None,
+            trash_retention_days=int(trash_retention_days) if trash_retention_days else None,
+            skip_trash='skip_trash' in row
+        ))
+    return actions
+
+
+# Select options for the condition/action type fields; static, so built once
+CONDITION_CHOICES = (
+    (ConditionType.SENDER_CONTAINS.value, 'Sender Contains'),
+    (ConditionType.SENDER_DOMAIN.value, 'Sender Domain'),
+    (ConditionType.SENDER_EXACT.value, 'Sender Exact Match'),
+    (ConditionType.SUBJECT_CONTAINS.value, 'Subject Contains'),
+    (ConditionType.SUBJECT_EXACT.value, 'Subject Exact Match'),
+    (ConditionType.SUBJECT_REGEX.value, 'Subject Regex'),
+    (ConditionType.CONTENT_CONTAINS.value, 'Content Contains'),
+    (ConditionType.SENDER_IN_LIST.value, 'Sender Is In List')
+)
+
+ACTION_CHOICES = (
+    (ActionType.MOVE_TO_FOLDER.value, 'Move to Folder'),
+    (ActionType.ADD_TO_LIST.value, 'Add to List'),
+    (ActionType.CREATE_LIST.value, 'Create List'),
+    (ActionType.SET_RETENTION.value, 'Set Retention Policy')
+)
+
+
 class ConditionForm(FlaskForm):
     """Form for a single rule condition"""
-    type = SelectField('Condition Type', choices=[
-        (ConditionType.SENDER_CONTAINS.value, 'Sender Contains'),
-        (ConditionType.SENDER_DOMAIN.value, 'Sender Domain'),
-        (ConditionType.SENDER_EXACT.value, 'Sender Exact Match'),
-        (ConditionType.SUBJECT_CONTAINS.value, 'Subject Contains'),
-        (ConditionType.SUBJECT_EXACT.value, 'Subject Exact Match'),
-        (ConditionType.SUBJECT_REGEX.value, 'Subject Regex'),
-        (ConditionType.CONTENT_CONTAINS.value, 'Content Contains'),
-        (ConditionType.SENDER_IN_LIST.value, 'Sender Is In List')
-    ])
+    type = SelectField('Condition Type', choices=CONDITION_CHOICES)
     value = StringField('Value', validators=[DataRequired()])
     case_sensitive = BooleanField('Case Sensitive')
 
 
 class ActionForm(FlaskForm):
     """Form for a single rule action"""
-    type = SelectField('Action Type', choices=[
-        (ActionType.MOVE_TO_FOLDER.value, 'Move to Folder'),
-        (ActionType.ADD_TO_LIST.value, 'Add to List'),
-        (ActionType.CREATE_LIST.value, 'Create List'),
-        (ActionType.SET_RETENTION.value, 'Set Retention Policy')
-    ])
+    type = SelectField('Action Type', choices=ACTION_CHOICES)
     target = StringField('Target', validators=[DataRequired()])
     # Retention-specific fields
     retention_days = IntegerField('Days before moving to trash', validators=[
@@ -209,20 +387,56 @@ class RuleForm(FlaskForm):
 @login_required
 def list_rules():
     """List all configured rules"""
-    rules_engine = get_rules_engine()
-    rules = rules_engine.get_all_rules()
-    return render_template('rules/list.html', rules=rules, templates=RULE_TEMPLATES)
+    # Answer 304 Not Modified while nothing the page renders has changed
+    etag = rules_page_etag()
+    if '_flashes' not in session and request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        rules_engine = get_rules_engine()
+        rules = rules_engine.get_all_rules()
+        context = {'rules': rules, 'templates': RULE_TEMPLATES}
+        if '_flashes' in session or 'csrf_token' not in session:
+            # Rendering would modify the session (pop flashes, create the
+            # CSRF token), which must happen before the cookie is sent
+            response = make_response(render_template('rules/list.html', **context))
+        else:
+            # Flush the page in chunks as Jinja renders it instead of
+            # building the whole HTML string for long rule tables first
+            response = current_app.response_class(stream_template('rules/list.html', **context))
+    
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def rules_page_etag():
+    """
+    Build an ETag for the rules list page
+    
+    Covers everything the page renders from: rules.json, the signed-in
+    user, the account count shown in the layout and the session's CSRF
+    token. A time bucket of half the CSRF time limit makes sure a cached
+    page never carries an expired CSRF token.
+    """
+    csrf_time_limit = current_app.config.get('WTF_CSRF_TIME_LIMIT') or 3600
+    state = (
+        file_stamp(current_app.mail_config.config_dir / 'rules.json'),
+        session.get('username'),
+        session.get('csrf_token'),
+        len(current_app.mail_config.accounts),
+        int(time.time() // (csrf_time_limit / 2))
+    )
+    return hashlib.sha1(repr(state).encode('utf-8')).hexdigest()
 
 
 @rules_bp.route('/add')
 @login_required
 def add_rule():
     """Add a new rule"""
-    # Get available accounts for the dropdown using fresh config
+    # Get available accounts for the dropdown (reloaded when the config changes)
     try:
-        from config import Config
-        fresh_config = Config(current_app.mail_config.base_dir, current_app.mail_config.config_file, current_app.mail_config.use_encryption)
-        accounts = fresh_config.accounts
+        accounts = get_saved_accounts()
         current_app.logger.info(f"Loaded {len(accounts)} accounts for rule creation")
     except Exception as e:
         current_app.logger.error(f"Error loading accounts for rule creation: {e}")
@@ -238,55 +452,19 @@ def add_rule():
 def create_rule():
     """Create a new rule"""
     try:
-        # Extract basic rule information
-        name = request.form.get('name')
-        account_email = request.form.get('account_email', '')
-        description = request.form.get('description', '')
-        condition_logic = request.form.get('condition_logic', 'AND')
-        priority = int(request.form.get('priority', 100))
-        active = 'active' in request.form
-        
-        # Extract conditions
-        conditions = []
-        condition_index = 0
-        while f'conditions-{condition_index}-type' in request.form:
-            condition_type = request.form.get(f'conditions-{condition_index}-type')
-            condition_value = request.form.get(f'conditions-{condition_index}-value')
-            case_sensitive = f'conditions-{condition_index}-case_sensitive' in request.form
-            
-            if condition_type and condition_value:
-                conditions.append(RuleCondition(
-                    type=ConditionType(condition_type),
-                    value=condition_value,
-                    case_sensitive=case_sensitive
-                ))
-            condition_index += 1
-        
-        # Extract actions
-        actions = []
-        action_index = 0
-        while f'actions-{action_index}-type' in request.form:
-            action_type = request.form.get(f'actions-{action_index}-type')
-            action_target = request.form.get(f'actions-{action_index}-target')
-            
-            if action_type and action_target:
-                # Extract retention parameters
-                retention_days = request.form.get(f'actions-{action_index}-retention_days')
-                trash_retention_days = request.form.get(f'actions-{action_index}-trash_retention_days')
-                skip_trash = f'actions-{action_index}-skip_trash' in request.form
-                
-                # Convert retention parameters to integers if provided
-                retention_days_int = int(retention_days) if retention_days and retention_days.strip() else None
-                trash_retention_days_int = int(trash_retention_days) if trash_retention_days and trash_retention_days.strip() else None
-                
-                actions.append(RuleAction(
-                    type=ActionType(action_type),
-                    target=action_target,
-                    retention_days=retention_days_int,
-                    trash_retention_days=trash_retention_days_int,
-                    skip_trash=skip_trash
-                ))
-            action_index += 1
+        # Extract basic rule information (resolve the request proxy once)
+        form = request.form
+        name = form.get('name')
+        account_email = form.get('account_email', '')
+        description = form.get('description', '')
+        condition_logic = form.get('condition_logic', 'AND')
+        priority = int(form.get('priority', 100))
+        active = 'active' in form
+        
+        # Extract conditions and actions
+        rows = parse_form_rows(form)
+        conditions = parse_conditions(rows['conditions'])
+        actions = parse_actions(rows['actions'])
         
         # Validate required fields
         if not name or not conditions or not actions:
@@ -294,8 +472,9 @@ def create_rule():
             return redirect(url_for('rules.add_rule'))
         
         # Create rule for validation
+        now = datetime.now().isoformat()
         rule = EmailRule(
-            id=str(uuid.uuid4()),
+            id=uuid.uuid4().hex,
             name=name,
             description=description,
             conditions=conditions,
@@ -304,20 +483,19 @@ def create_rule():
             condition_logic=condition_logic,
             priority=priority,
             active=active,
-            created_at=datetime.now().isoformat(),
-            updated_at=datetime.now().isoformat()
+            created_at=now,
+            updated_at=now
         )
         
-        # Validate rule
-        is_valid, validation_errors = validate_rule(rule)
-        if not is_valid:
-            for error in validation_errors:
-                flash(error, 'error')
-            return redirect(url_for('rules.add_rule'))
-        
-        # Save rule
-        rules_engine = get_rules_engine()
-        rules_engine.add_rule(rule)
+        # Validate rule and save it with the same engine
+        with editing_rules_engine() as rules_engine:
+            is_valid, validation_errors = validate_rule(rule, rules_engine=rules_engine)
+            if not is_valid:
+                for error in validation_errors:
+                    flash(error, 'error')
+                return redirect(url_for('rules.add_rule'))
+            
+            rules_engine.add_rule(rule)
         
         # Ensure any list files referenced in actions are created
         ensure_list_files_exist(rule)
@@ -341,11 +519,9 @@ def edit_rule(rule_id):
         flash('Rule not found', 'error')
         return redirect(url_for('rules.list_rules'))
     
-    # Get available accounts for the dropdown using fresh config
+    # Get available accounts for the dropdown (reloaded when the config changes)
     try:
-        from config import Config
-        fresh_config = Config(current_app.mail_config.base_dir, current_app.mail_config.config_file, current_app.mail_config.use_encryption)
-        accounts = fresh_config.accounts
+        accounts = get_saved_accounts()
         current_app.logger.info(f"Loaded {len(accounts)} accounts for rule editing")
     except Exception as e:
         current_app.logger.error(f"Error loading accounts for rule editing: {e}")
@@ -368,55 +544,19 @@ def update_rule(rule_id):
         return redirect(url_for('rules.list_rules'))
     
     try:
-        # Extract basic rule information
-        name = request.form.get('name')
-        account_email = request.form.get('account_email', '')
-        description = request.form.get('description', '')
-        condition_logic = request.form.get('condition_logic', 'AND')
-        priority = int(request.form.get('priority', 100))
-        active = 'active' in request.form
-        
-        # Extract conditions
-        conditions = []
-        condition_index = 0
-        while f'conditions-{condition_index}-type' in request.form:
-            condition_type = request.form.get(f'conditions-{condition_index}-type')
-            condition_value = request.form.get(f'conditions-{condition_index}-value')
-            case_sensitive = f'conditions-{condition_index}-case_sensitive' in request.form
-            
-            if condition_type and condition_value:
-                conditions.append(RuleCondition(
-                    type=ConditionType(condition_type),
-                    value=condition_value,
-                    case_sensitive=case_sensitive
-                ))
-            condition_index += 1
-        
-        # Extract actions
-        actions = []
-        action_index = 0
-        while f'actions-{action_index}-type' in request.form:
-            action_type = request.form.get(f'actions-{action_index}-type')
-            action_target = request.form.get(f'actions-{action_index}-target')
-            
-            if action_type and action_target:
-                # Extract retention parameters
-                retention_days = request.form.get(f'actions-{action_index}-retention_days')
-                trash_retention_days = request.form.get(f'actions-{action_index}-trash_retention_days')
-                skip_trash = f'actions-{action_index}-skip_trash' in request.form
-                
-                # Convert retention parameters to integers if provided
-                retention_days_int = int(retention_days) if retention_days and retention_days.strip() else None
-                trash_retention_days_int = int(trash_retention_days) if trash_retention_days and trash_retention_days.strip() else None
-                
-                actions.append(RuleAction(
-                    type=ActionType(action_type),
-                    target=action_target,
-                    retention_days=retention_days_int,
-                    trash_retention_days=trash_retention_days_int,
-                    skip_trash=skip_trash
-                ))
-            action_index += 1
+        # Extract basic rule information (resolve the request proxy once)
+        form = request.form
+        name = form.get('name')
+        account_email = form.get('account_email', '')
+        description = form.get('description', '')
+        condition_logic = form.get('condition_logic', 'AND')
+        priority = int(form.get('priority', 100))
+        active = 'active' in form
+        
+        # Extract conditions and actions
+        rows = parse_form_rows(form)
+        conditions = parse_conditions(rows['conditions'])
+        actions = parse_actions(rows['actions'])
         
         # Validate required fields
         if not name or not conditions or not actions:
@@ -438,15 +578,18 @@ def update_rule(rule_id):
             updated_at=datetime.now().isoformat()
         )
         
-        # Validate rule (exclude current rule from duplicate name check)
-        is_valid, validation_errors = validate_rule(updated_rule, exclude_rule_id=rule_id)
-        if not is_valid:
-            for error in validation_errors:
-                flash(error, 'error')
-            return redirect(url_for('rules.edit_rule', rule_id=rule_id))
-        
-        # Save rule
-        rules_engine.update_rule(rule_id, updated_rule)
+        with editing_rules_engine() as rules_engine:
+            # Validate rule (exclude current rule from duplicate name check)
+            is_valid, validation_errors = validate_rule(updated_rule, exclude_rule_id=rule_id, rules_engine=rules_engine)
+            if not is_valid:
+                for error in validation_errors:
+                    flash(error, 'error')
+                return redirect(url_for('rules.edit_rule', rule_id=rule_id))
+            
+            # The rule may have been deleted since the form was loaded
+            if not rules_engine.update_rule(rule_id, updated_rule):
+                flash('Rule not found', 'error')
+                return redirect(url_for('rules.list_rules'))
         
         # Ensure any list files referenced in actions are created
         ensure_list_files_exist(updated_rule)
@@ -464,13 +607,14 @@ def update_rule(rule_id):
 def delete_rule(rule_id):
     """Delete a rule"""
     try:
-        rules_engine = get_rules_engine()
-        rule = rules_engine.get_rule(rule_id)
+        with editing_rules_engine() as rules_engine:
+            rule = rules_engine.get_rule(rule_id)
+            if rule:
+                rules_engine.delete_rule(rule_id)
         
         if not rule:
             flash('Rule not found', 'error')
         else:
-            rules_engine.delete_rule(rule_id)
             flash(f'Rule "{rule.name}" deleted successfully!', 'success')
     except Exception as e:
         flash(f'Error deleting rule: {str(e)}', 'error')
@@ -483,22 +627,21 @@ def delete_rule(rule_id):
 def create_from_template(template_name):
     """Create a rule from a template"""
     try:
-        rule = create_rule_from_template(template_name, str(uuid.uuid4()))
+        rule = create_rule_from_template(template_name, uuid.uuid4().hex)
         
         if not rule:
             flash('Template not found', 'error')
             return redirect(url_for('rules.list_rules'))
         
         # Set timestamps
-        rule.created_at = datetime.now().isoformat()
-        rule.updated_at = datetime.now().isoformat()
+        rule.created_at = rule.updated_at = datetime.now().isoformat()
         
         # Save rule
-        rules_engine = get_rules_engine()
-        rules_engine.add_rule(rule)
+        with editing_rules_engine() as rules_engine:
+            rules_engine.add_rule(rule)
         
-        # Ensure any list files referenced in actions are created
-        ensure_list_files_exist(rule)
+        # Templates are vetted, so their list files are known up front
+        create_list_files(TEMPLATE_LIST_FILES[template_name])
         
         flash(f'Rule "{rule.name}" created from template!', 'success')
         
@@ -508,12 +651,59 @@ def create_from_template(template_name):
     return redirect(url_for('rules.list_rules'))
 
 
+@rules_bp.route('/template/batch', methods=['POST'])
+@login_required
+def create_from_templates():
+    """Create rules from several templates, saving the rules file once"""
+    try:
+        template_names = loads(request.get_data())
+        if not isinstance(template_names, list) or not template_names:
+            return json_response({'success': False, 'error': 'Expected a list of template names'}, status=400)
+        
+        unknown = [name for name in template_names if not isinstance(name, str) or name not in RULE_TEMPLATES]
+        if unknown:
+            return json_response({'success': False, 'error': f"Templates not found: {', '.join(map(str, unknown))}"}, status=404)
+        
+        # Skip repeated templates and any whose rule name is already taken,
+        # so re-submitting a batch doesn't create duplicate rules
+        now = datetime.now().isoformat()
+        rules = []
+        skipped = []
+        created_templates = []
+        with editing_rules_engine() as rules_engine:
+            for template_name in dict.fromkeys(template_names):
+                if rules_engine.get_rule_ids_by_name(RULE_TEMPLATES[template_name]['name']):
+                    skipped.append(template_name)
+                    continue
+                rule = create_rule_from_template(template_name, uuid.uuid4().hex)
+                rule.created_at = rule.updated_at = now
+                rules.append(rule)
+                created_templates.append(template_name)
+            
+            # Save all rules with a single write of rules.json
+            if rules:
+                rules_engine.add_rules(rules)
+        
+        if rules:
+            create_list_files(frozenset().union(*(TEMPLATE_LIST_FILES[name] for name in created_templates)))
+        
+        return json_response({
+            'success': True,
+            'rules': [{'id': rule.id, 'name': rule.name} for rule in rules],
+            'skipped': skipped
+        })
+        
+    except Exception as e:
+        current_app.logger.error(f"Error creating rules from templates: {e}")
+        return json_response({'success': False, 'error': str(e)}, status=500)
+
+
 @rules_bp.route('/api/test', methods=['POST'])
 @login_required
 def test_rule():
     """Test a rule against sample email data"""
     try:
-        data = request.get_json()
+        data = loads(request.get_data())
         rule_data = data.get('rule')
         email_data = data.get('email')
         
@@ -521,7 +711,7 @@ def test_rule():
         conditions = []
         for cond_data in rule_data.get('conditions', []):
             conditions.append(RuleCondition(
-                type=ConditionType(cond_data['type']),
+                type=type_member(CONDITION_TYPES, cond_data['type']),
                 value=cond_data['value'],
                 case_sensitive=cond_data.get('case_sensitive', False)
             ))
@@ -529,7 +719,7 @@ def test_rule():
         actions = []
         for action_data in rule_data.get('actions', []):
             actions.append(RuleAction(
-                type=ActionType(action_data['type']),
+                type=type_member(ACTION_TYPES, action_data['type']),
                 target=action_data['target']
             ))
         
@@ -545,21 +735,36 @@ def test_rule():
         # Test rule
         matches = rule.matches(email_data)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'matches': matches,
             'actions': [{'type': action.type.value, 'target': action.target} for action in actions] if matches else []
         })
         
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return json_response({'success': False, 'error': str(e)})
 
 
 @rules_bp.route('/api/templates')
 @login_required
 def get_templates():
     """Get available rule templates"""
-    return jsonify({
-        'success': True,
-        'templates': RULE_TEMPLATES
-    })
\ No newline at end of file
+    global _templates_body
+    
+    # Templates never change at runtime, so serialize them once
+    if _templates_body is None:
+        templates = {
+            name: {
+                **template,
+                'conditions': [{**c, 'type': c['type'].value} for c in template['conditions']],
+                'actions': [{**a, 'type': a['type'].value} for a in template['actions']]
+            }
+            for name, template in RULE_TEMPLATES.items()
+        }
+        _templates_body = dumps({'success': True, 'templates': templates})
+    
+    response = current_app.response_class(_templates_body, mimetype='application/json')
+    response.add_etag()
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
\ No newline at end of file
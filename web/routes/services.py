@@ -19,38 +19,136 @@ Provides REST API for starting, stopping, monitoring, and managing
 email processing services across multiple accounts.
 """
 
+import json
 import logging
-from flask import Blueprint, request, jsonify, current_app, redirect, url_for
-from werkzeug.exceptions import BadRequest, NotFound
-from functools import wraps
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import Blueprint, request, current_app, redirect, url_for, g
+from werkzeug.exceptions import BadRequest, HTTPException, NotFound
+from functools import lru_cache, wraps
 
 from services.task_manager import get_task_manager
 from services.email_processor import ProcessingMode, ServiceState
+from web.json_utils import dumps, loads, json_response
 
 # Create blueprint
 services_bp = Blueprint('services', __name__, url_prefix='/api/services')
 logger = logging.getLogger(__name__)
 
+# How long an encoded /status or /stats body may be reused while the task
+# manager's state version is unchanged (processing stats move without one)
+STATUS_CACHE_TTL = 1.0
+
+# Bounded pool for bulk account operations, so a bulk start doesn't open
+# a connection per account against the IMAP servers all at once
+_bulk_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='svc-bulk')
+
+# Separate pool for /status/full inbox counts, so slow IMAP servers there
+# can't hold up bulk starts
+_inbox_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='svc-inbox')
+
+# Seconds to wait for all accounts to start during a bulk start
+BULK_START_TIMEOUT = 60
+
+# Seconds to wait for all inbox counts in /status/full
+INBOX_COUNT_TIMEOUT = 30
+
+# Largest limit served by the log and task history endpoints (larger ones are clamped)
+MAX_LIST_LIMIT = 1000
+
+# Processing modes accepted by the start/mode endpoints
+PROCESSING_MODES = {
+    'startup': ProcessingMode.STARTUP,
+    'maintenance': ProcessingMode.MAINTENANCE
+}
+
+# Fixed error responses, encoded once (stdlib json: no app is needed at import)
+ERROR_BODIES = {
+    status: json.dumps({'success': False, 'error': message}, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    for status, message in (
+        (400, 'Bad request'),
+        (401, 'Authentication required'),
+        (404, 'Not found'),
+        (415, 'Content-Type must be application/json'),
+        (500, 'Internal server error')
+    )
+}
+
+# Encoded response bodies, keyed on the task manager and its history version
+_status_cache = {'key': None, 'timestamp': 0.0, 'body': None}
+_stats_cache = {'key': None, 'timestamp': 0.0, 'body': None}
+_history_cache = {'key': None, 'timestamp': 0.0, 'body': None}
+
+# Encoded account status bodies by email: (processor, state_version, body)
+_account_status_cache = {}
+
 
 def login_required(f):
     """Decorator to require authentication for API routes"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_app.get_current_user():
+        # Reuse the user before_request already looked up for this request
+        user = g.current_user if 'current_user' in g else current_app.get_current_user()
+        if not user:
             # For API endpoints, return JSON error instead of redirect
-            return jsonify({'success': False, 'error': 'Authentication required'}), 401
+            return error_response(401)
         return f(*args, **kwargs)
     return decorated_function
 
 
+def error_response(status):
+    """Build a response for one of the fixed ERROR_BODIES"""
+    return current_app.response_class(ERROR_BODIES[status], status=status, mimetype='application/json')
+
+
+@lru_cache(maxsize=256)
+def account_not_found_body(account_email):
+    """Encoded 404 body for an unknown account (bounded, so bad emails can't grow it)"""
+    return dumps({'success': False, 'error': f'Account {account_email} not found'})
+
+
+def account_not_found(account_email):
+    """Build the 404 response for an unknown account"""
+    return current_app.response_class(account_not_found_body(account_email), status=404, mimetype='application/json')
+
+
+def api_error(f):
+    """Decorator turning unhandled errors in API routes into a JSON 500 response"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        try:
+            return f(*args, **kwargs)
+        except HTTPException:
+            # Deliberate aborts (e.g. a malformed body) keep their status
+            raise
+        except Exception as e:
+            context = ', '.join(f'{key}={value}' for key, value in kwargs.items())
+            logger.error(f"{f.__name__}({context}) failed: {e}")
+            return json_response({
+                'success': False,
+                'error': str(e)
+            }, status=500)
+    return decorated_function
+
+
 @services_bp.before_request
 def before_request():
     """Check authentication for all service endpoints"""
-    if not current_app.get_current_user():
-        return jsonify({'success': False, 'error': 'Authentication required'}), 401
+    g.current_user = current_app.get_current_user()
+    if not g.current_user:
+        return error_response(401)
+    
+    # The blueprint is CSRF-exempt: requiring a JSON content type keeps
+    # cross-site form posts (which can't set it) from reaching the actions
+    if request.method == 'POST' and not request.is_json:
+        return error_response(415)
+    
+    # Resolve the task manager singleton once per request
+    g.task_manager = get_task_manager()
 
 
 @services_bp.route('/status', methods=['GET'])
+@api_error
 def get_system_status():
     """
     Get overall system status
@@ -58,24 +156,17 @@ def get_system_status():
     Returns:
         JSON: Complete system status including all accounts
     """
-    try:
-        task_manager = get_task_manager()
-        status = task_manager.get_all_status()
-        
-        return jsonify({
-            'success': True,
-            'data': status
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get system status: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    task_manager = g.task_manager
+    body = cached_body(_status_cache, task_manager, lambda: {
+        'success': True,
+        'data': task_manager.get_all_status()
+    })
+    
+    return current_app.response_class(body, mimetype='application/json')
 
 
 @services_bp.route('/stats', methods=['GET'])
+@api_error
 def get_aggregate_stats():
     """
     Get aggregated statistics across all accounts
@@ -83,24 +174,89 @@ def get_aggregate_stats():
     Returns:
         JSON: Aggregated processing statistics
     """
+    task_manager = g.task_manager
+    body = cached_body(_stats_cache, task_manager, lambda: {
+        'success': True,
+        'data': task_manager.get_aggregate_stats()
+    })
+    
+    return current_app.response_class(body, mimetype='application/json')
+
+
+def cached_body(cache, task_manager, build, extra_key=()):
+    """
+    Get an encoded JSON body from cache, rebuilding it when stale
+    
+    The cached body is reused for up to STATUS_CACHE_TTL seconds while the
+    task manager's history version (bumped on every start, stop, mode
+    switch and account change) stays the same.
+    
+    Args:
+        cache: Module-level cache dict for the endpoint
+        task_manager: Task manager the body describes
+        build: Callable returning the payload to encode
+        extra_key: Request parameters the body depends on
+    """
+    key = (id(task_manager), task_manager.startup_time, task_manager.history_version) + extra_key
+    now = time.monotonic()
+    if cache['body'] is not None and cache['key'] == key and now - cache['timestamp'] < STATUS_CACHE_TTL:
+        return cache['body']
+    
+    body = dumps(build())
+    cache['key'] = key
+    cache['timestamp'] = now
+    cache['body'] = body
+    return body
+
+
+def request_json():
+    """
+    Parse the JSON request body, treating an empty or null body as {}
+    
+    Raises:
+        BadRequest: If the body is not valid JSON or not a JSON object
+    """
+    body = request.get_data()
     try:
-        task_manager = get_task_manager()
-        stats = task_manager.get_aggregate_stats()
-        
-        return jsonify({
-            'success': True,
-            'data': stats
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get aggregate stats: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+        data = (loads(body) if body else None) or {}
+    except ValueError:
+        raise BadRequest('Malformed JSON body')
+    if not isinstance(data, dict):
+        raise BadRequest('JSON body must be an object')
+    return data
+
+
+def query_limit(default):
+    """
+    Get the 'limit' query parameter, clamped to 1..MAX_LIST_LIMIT
+    
+    A missing or non-integer limit falls back to default.
+    """
+    limit = request.args.get('limit', default, type=int)
+    return min(max(limit, 1), MAX_LIST_LIMIT)
+
+
+def parse_mode(data, default):
+    """
+    Look up the processing mode named in a request body
+    
+    Returns:
+        tuple: (ProcessingMode or None if the name is unknown, lowercased name)
+    """
+    mode_str = str(data.get('mode', default) or '').lower()
+    return PROCESSING_MODES.get(mode_str), mode_str
+
+
+def invalid_mode_response(mode_str):
+    """Build the 400 response for an unknown processing mode"""
+    return json_response({
+        'success': False,
+        'error': f'Invalid mode: {mode_str}. Must be "startup" or "maintenance"'
+    }, status=400)
 
 
 @services_bp.route('/accounts/<account_email>/status', methods=['GET'])
+@api_error
 def get_account_status(account_email: str):
     """
     Get status for a specific account
@@ -111,30 +267,30 @@ def get_account_status(account_email: str):
     Returns:
         JSON: Account status information
     """
-    try:
-        task_manager = get_task_manager()
-        status = task_manager.get_account_status(account_email)
-        
-        if status is None:
-            return jsonify({
-                'success': False,
-                'error': f'Account {account_email} not found'
-            }), 404
-        
-        return jsonify({
+    task_manager = g.task_manager
+    processor = task_manager._get_processor(account_email)
+    
+    if not processor:
+        return account_not_found(account_email)
+    
+    # Reuse the encoded status until the processor reports a state change.
+    # The version is read first, so a change during encoding forces a rebuild.
+    version = processor.state_version
+    cached = _account_status_cache.get(account_email)
+    if cached and cached[0] is processor and cached[1] == version:
+        body = cached[2]
+    else:
+        body = dumps({
             'success': True,
-            'data': status
+            'data': processor.get_status()
         })
-        
-    except Exception as e:
-        logger.error(f"Failed to get status for account {account_email}: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+        _account_status_cache[account_email] = (processor, version, body)
+    
+    return current_app.response_class(body, mimetype='application/json')
 
 
 @services_bp.route('/accounts/<account_email>/folders/status', methods=['GET'])
+@api_error
 def get_account_folder_status(account_email: str):
     """
     Get folder status for an account (what folders exist vs what's needed)
@@ -145,32 +301,22 @@ def get_account_folder_status(account_email: str):
     Returns:
         JSON: Folder status information including missing folders
     """
-    try:
-        task_manager = get_task_manager()
-        processor = task_manager._get_processor(account_email)
-        
-        if not processor:
-            return jsonify({
-                'success': False,
-                'error': f'Account {account_email} not found'
-            }), 404
-        
-        folder_status = processor.get_folder_status()
-        
-        return jsonify({
-            'success': True,
-            'data': folder_status
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get folder status for account {account_email}: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    task_manager = g.task_manager
+    processor = task_manager._get_processor(account_email)
+    
+    if not processor:
+        return account_not_found(account_email)
+    
+    folder_status = processor.get_folder_status()
+    
+    return json_response({
+        'success': True,
+        'data': folder_status
+    })
 
 
 @services_bp.route('/accounts/<account_email>/folders/create', methods=['POST'])
+@api_error
 def create_account_folders(account_email: str):
     """
     Create missing folders for an account
@@ -184,54 +330,44 @@ def create_account_folders(account_email: str):
     Returns:
         JSON: Creation results
     """
-    try:
-        # Parse request data
-        data = request.get_json() or {}
-        confirm = data.get('confirm', False)
-        
-        if not confirm:
-            return jsonify({
-                'success': False,
-                'error': 'Folder creation requires explicit confirmation. Set "confirm": true in request body.'
-            }), 400
-        
-        task_manager = get_task_manager()
-        processor = task_manager._get_processor(account_email)
-        
-        if not processor:
-            return jsonify({
-                'success': False,
-                'error': f'Account {account_email} not found'
-            }), 404
-        
-        # Run folder validation and creation
-        result = processor._validate_and_setup_folders()
-        
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'message': f"Folder setup completed for {account_email}",
-                'data': {
-                    'created_folders': result['created_folders'],
-                    'existing_folders': len(result['existing_folders']),
-                    'total_required': len(result['required_folders'])
-                }
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': f"Folder setup failed: {result['error']}"
-            }), 500
-        
-    except Exception as e:
-        logger.error(f"Failed to create folders for account {account_email}: {e}")
-        return jsonify({
+    # Parse request data
+    data = request_json()
+    confirm = data.get('confirm', False)
+    
+    if not confirm:
+        return json_response({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'Folder creation requires explicit confirmation. Set "confirm": true in request body.'
+        }, status=400)
+    
+    task_manager = g.task_manager
+    processor = task_manager._get_processor(account_email)
+    
+    if not processor:
+        return account_not_found(account_email)
+    
+    # Run folder validation and creation
+    result = processor._validate_and_setup_folders()
+    
+    if result['success']:
+        return json_response({
+            'success': True,
+            'message': f"Folder setup completed for {account_email}",
+            'data': {
+                'created_folders': result['created_folders'],
+                'existing_folders': len(result['existing_folders']),
+                'total_required': len(result['required_folders'])
+            }
+        })
+    else:
+        return json_response({
+            'success': False,
+            'error': f"Folder setup failed: {result['error']}"
+        }, status=500)
 
 
 @services_bp.route('/accounts/<account_email>/start', methods=['POST'])
+@api_error
 def start_account(account_email: str):
     """
     Start email processing for an account
@@ -245,46 +381,30 @@ def start_account(account_email: str):
     Returns:
         JSON: Success/failure result
     """
-    try:
-        # Parse request data
-        data = request.get_json() or {}
-        mode_str = data.get('mode', 'startup').lower()
-        
-        # Validate mode
-        if mode_str == 'startup':
-            mode = ProcessingMode.STARTUP
-        elif mode_str == 'maintenance':
-            mode = ProcessingMode.MAINTENANCE
-        else:
-            return jsonify({
-                'success': False,
-                'error': f'Invalid mode: {mode_str}. Must be "startup" or "maintenance"'
-            }), 400
-        
-        # Start the service
-        task_manager = get_task_manager()
-        result = task_manager.start_account(account_email, mode)
-        
-        if result:
-            return jsonify({
-                'success': True,
-                'message': f'Started email processing for {account_email} in {mode_str} mode'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': f'Failed to start email processing for {account_email}'
-            }), 500
-        
-    except Exception as e:
-        logger.error(f"Failed to start account {account_email}: {e}")
-        return jsonify({
+    # Parse request data
+    data = request_json()
+    mode, mode_str = parse_mode(data, 'startup')
+    if mode is None:
+        return invalid_mode_response(mode_str)
+    
+    # Start the service
+    task_manager = g.task_manager
+    result = task_manager.start_account(account_email, mode)
+    
+    if result:
+        return json_response({
+            'success': True,
+            'message': f'Started email processing for {account_email} in {mode_str} mode'
+        })
+    else:
+        return json_response({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': f'Failed to start email processing for {account_email}'
+        }, status=500)
 
 
 @services_bp.route('/accounts/<account_email>/stop', methods=['POST'])
+@api_error
 def stop_account(account_email: str):
     """
     Stop email processing for an account
@@ -295,30 +415,23 @@ def stop_account(account_email: str):
     Returns:
         JSON: Success/failure result
     """
-    try:
-        task_manager = get_task_manager()
-        result = task_manager.stop_account(account_email)
-        
-        if result:
-            return jsonify({
-                'success': True,
-                'message': f'Stopped email processing for {account_email}'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': f'Failed to stop email processing for {account_email}'
-            }), 500
-        
-    except Exception as e:
-        logger.error(f"Failed to stop account {account_email}: {e}")
-        return jsonify({
+    task_manager = g.task_manager
+    result = task_manager.stop_account(account_email)
+    
+    if result:
+        return json_response({
+            'success': True,
+            'message': f'Stopped email processing for {account_email}'
+        })
+    else:
+        return json_response({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': f'Failed to stop email processing for {account_email}'
+        }, status=500)
 
 
 @services_bp.route('/accounts/<account_email>/restart', methods=['POST'])
+@api_error
 def restart_account(account_email: str):
     """
     Restart email processing for an account
@@ -329,30 +442,23 @@ def restart_account(account_email: str):
     Returns:
         JSON: Success/failure result
     """
-    try:
-        task_manager = get_task_manager()
-        result = task_manager.restart_account(account_email)
-        
-        if result:
-            return jsonify({
-                'success': True,
-                'message': f'Restarted email processing for {account_email}'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': f'Failed to restart email processing for {account_email}'
-            }), 500
-        
-    except Exception as e:
-        logger.error(f"Failed to restart account {account_email}: {e}")
-        return jsonify({
+    task_manager = g.task_manager
+    result = task_manager.restart_account(account_email)
+    
+    if result:
+        return json_response({
+            'success': True,
+            'message': f'Restarted email processing for {account_email}'
+        })
+    else:
+        return json_response({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': f'Failed to restart email processing for {account_email}'
+        }, status=500)
 
 
 @services_bp.route('/accounts/<account_email>/mode', methods=['POST'])
+@api_error
 def switch_mode(account_email: str):
     """
     Switch processing mode for an account
@@ -366,46 +472,30 @@ def switch_mode(account_email: str):
     Returns:
         JSON: Success/failure result
     """
-    try:
-        # Parse request data
-        data = request.get_json() or {}
-        mode_str = data.get('mode', '').lower()
-        
-        # Validate mode
-        if mode_str == 'startup':
-            mode = ProcessingMode.STARTUP
-        elif mode_str == 'maintenance':
-            mode = ProcessingMode.MAINTENANCE
-        else:
-            return jsonify({
-                'success': False,
-                'error': f'Invalid mode: {mode_str}. Must be "startup" or "maintenance"'
-            }), 400
-        
-        # Switch mode
-        task_manager = get_task_manager()
-        result = task_manager.switch_mode(account_email, mode)
-        
-        if result:
-            return jsonify({
-                'success': True,
-                'message': f'Switched {account_email} to {mode_str} mode'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': f'Failed to switch mode for {account_email}'
-            }), 500
-        
-    except Exception as e:
-        logger.error(f"Failed to switch mode for account {account_email}: {e}")
-        return jsonify({
+    # Parse request data
+    data = request_json()
+    mode, mode_str = parse_mode(data, '')
+    if mode is None:
+        return invalid_mode_response(mode_str)
+    
+    # Switch mode
+    task_manager = g.task_manager
+    result = task_manager.switch_mode(account_email, mode)
+    
+    if result:
+        return json_response({
+            'success': True,
+            'message': f'Switched {account_email} to {mode_str} mode'
+        })
+    else:
+        return json_response({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': f'Failed to switch mode for {account_email}'
+        }, status=500)
 
 
 @services_bp.route('/accounts/<account_email>/logs', methods=['GET'])
+@api_error
 def get_account_logs(account_email: str):
     """
     Get recent logs for an account
@@ -419,37 +509,30 @@ def get_account_logs(account_email: str):
     Returns:
         JSON: Recent log entries
     """
-    try:
-        limit = request.args.get('limit', 50, type=int)
-        
-        # TODO: Implement log reading functionality
-        # For now, return placeholder
-        logs = [
-            {
-                'timestamp': '2025-01-07T12:00:00Z',
-                'level': 'INFO',
-                'message': f'Email processing active for {account_email}',
-                'module': 'email_processor'
-            }
-        ]
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'account_email': account_email,
-                'logs': logs[-limit:] if logs else []
-            }
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get logs for account {account_email}: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    limit = query_limit(50)
+    
+    # TODO: Implement log reading functionality
+    # For now, return placeholder
+    logs = [
+        {
+            'timestamp': '2025-01-07T12:00:00Z',
+            'level': 'INFO',
+            'message': f'Email processing active for {account_email}',
+            'module': 'email_processor'
+        }
+    ]
+    
+    return json_response({
+        'success': True,
+        'data': {
+            'account_email': account_email,
+            'logs': logs[-limit:] if logs else []
+        }
+    })
 
 
 @services_bp.route('/bulk/start', methods=['POST'])
+@api_error
 def start_all_accounts():
     """
     Start email processing for all accounts
@@ -460,49 +543,51 @@ def start_all_accounts():
     Returns:
         JSON: Results for each account
     """
-    try:
-        # Parse request data
-        data = request.get_json() or {}
-        mode_str = data.get('mode', 'startup').lower()
-        
-        # Validate mode
-        if mode_str == 'startup':
-            mode = ProcessingMode.STARTUP
-        elif mode_str == 'maintenance':
-            mode = ProcessingMode.MAINTENANCE
-        else:
-            return jsonify({
-                'success': False,
-                'error': f'Invalid mode: {mode_str}. Must be "startup" or "maintenance"'
-            }), 400
-        
-        # Start all accounts
-        task_manager = get_task_manager()
-        results = {}
-        
-        # Get all account emails and start them
-        status = task_manager.get_all_status()
-        for account_email in status.get('accounts', {}):
-            results[account_email] = task_manager.start_account(account_email, mode)
-        
-        successful = sum(results.values())
-        total = len(results)
-        
-        return jsonify({
-            'success': True,
-            'message': f'Started {successful}/{total} accounts in {mode_str} mode',
-            'results': results
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to start all accounts: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    # Parse request data
+    data = request_json()
+    mode, mode_str = parse_mode(data, 'startup')
+    if mode is None:
+        return invalid_mode_response(mode_str)
+    
+    # Start all accounts, overlapping their IMAP logins on the bulk pool
+    task_manager = g.task_manager
+    futures = {
+        account_email: _bulk_pool.submit(task_manager.start_account, account_email, mode)
+        for account_email in task_manager.account_emails()
+    }
+    
+    # One deadline for the whole batch; accounts still starting after it
+    # are reported as pending rather than failed
+    done, _ = wait(futures.values(), timeout=BULK_START_TIMEOUT)
+    
+    # Count successes while collecting the results
+    results = {}
+    pending = []
+    successful = 0
+    for account_email, future in futures.items():
+        if future not in done:
+            logger.warning(f"Account {account_email} still starting after {BULK_START_TIMEOUT}s")
+            pending.append(account_email)
+            continue
+        started = future.result()
+        results[account_email] = started
+        successful += bool(started)
+    total = len(futures)
+    
+    message = f'Started {successful}/{total} accounts in {mode_str} mode'
+    if pending:
+        message += f' ({len(pending)} still starting)'
+    
+    return json_response({
+        'success': True,
+        'message': message,
+        'results': results,
+        'pending': pending
+    })
 
 
 @services_bp.route('/bulk/stop', methods=['POST'])
+@api_error
 def stop_all_accounts():
     """
     Stop email processing for all accounts
@@ -510,28 +595,21 @@ def stop_all_accounts():
     Returns:
         JSON: Results for each account
     """
-    try:
-        task_manager = get_task_manager()
-        results = task_manager.stop_all()
-        
-        successful = sum(results.values())
-        total = len(results)
-        
-        return jsonify({
-            'success': True,
-            'message': f'Stopped {successful}/{total} accounts',
-            'results': results
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to stop all accounts: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    task_manager = g.task_manager
+    results = task_manager.stop_all()
+    
+    successful = sum(results.values())
+    total = len(results)
+    
+    return json_response({
+        'success': True,
+        'message': f'Stopped {successful}/{total} accounts',
+        'results': results
+    })
 
 
 @services_bp.route('/task-history', methods=['GET'])
+@api_error
 def get_task_history():
     """
     Get recent task history
@@ -542,29 +620,26 @@ def get_task_history():
     Returns:
         JSON: Recent task history
     """
-    try:
-        limit = request.args.get('limit', 50, type=int)
-        
-        task_manager = get_task_manager()
+    limit = query_limit(50)
+    
+    task_manager = g.task_manager
+    
+    def build():
         history = task_manager.get_task_history(limit)
-        
-        return jsonify({
+        return {
             'success': True,
             'data': {
                 'history': history,
                 'count': len(history)
             }
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get task history: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+        }
+    
+    body = cached_body(_history_cache, task_manager, build, extra_key=(limit,))
+    return current_app.response_class(body, mimetype='application/json')
 
 
 @services_bp.route('/refresh-accounts', methods=['POST'])
+@api_error
 def refresh_accounts():
     """
     Refresh accounts from current configuration
@@ -576,39 +651,26 @@ def refresh_accounts():
     Returns:
         JSON: Success/failure result with refresh details
     """
-    try:
-        task_manager = get_task_manager()
-        
-        # Get current state before refresh
-        old_status = task_manager.get_all_status()
-        old_count = old_status['task_manager']['total_accounts']
-        
-        # Refresh accounts from config
-        task_manager.refresh_accounts_from_config()
-        
-        # Get new state after refresh
-        new_status = task_manager.get_all_status()
-        new_count = new_status['task_manager']['total_accounts']
-        
-        return jsonify({
-            'success': True,
-            'message': 'Accounts refreshed from configuration',
-            'data': {
-                'accounts_before': old_count,
-                'accounts_after': new_count,
-                'accounts_changed': new_count - old_count
-            }
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to refresh accounts: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    task_manager = g.task_manager
+    
+    # Refresh accounts from config, counting accounts before and after
+    old_count = task_manager.account_count()
+    task_manager.refresh_accounts_from_config()
+    new_count = task_manager.account_count()
+    
+    return json_response({
+        'success': True,
+        'message': 'Accounts refreshed from configuration',
+        'data': {
+            'accounts_before': old_count,
+            'accounts_after': new_count,
+            'accounts_changed': new_count - old_count
+        }
+    })
 
 
 @services_bp.route('/accounts/<account_email>/process-batch', methods=['POST'])
+@api_error
 def process_batch(account_email: str):
     """
     Process next batch of emails for an account in startup mode
@@ -622,61 +684,44 @@ def process_batch(account_email: str):
     Returns:
         JSON: Detailed batch processing results
     """
-    try:
-        # Parse request data
-        data = request.get_json() or {}
-        limit = data.get('limit', 100)
-        
-        # Validate limit
-        if not isinstance(limit, int) or limit < 1 or limit > 500:
-            return jsonify({
-                'success': False,
-                'error': 'Limit must be an integer between 1 and 500'
-            }), 400
-        
-        # Get the processor for this account
-        task_manager = get_task_manager()
-        processor = task_manager._get_processor(account_email)
-        
-        if not processor:
-            return jsonify({
-                'success': False,
-                'error': f'Account {account_email} not found'
-            }), 404
-        
-        # Check if account is in startup mode
-        account_status = task_manager.get_account_status(account_email)
-        if not account_status:
-            return jsonify({
-                'success': False,
-                'error': f'Cannot get status for account {account_email}'
-            }), 404
-            
-        current_mode = account_status.get('mode')
-        if current_mode != 'startup':
-            return jsonify({
-                'success': False,
-                'error': f'Batch processing only available in startup mode. Account is in {current_mode} mode.'
-            }), 400
-        
-        # Use the new manual processing method that includes all rule types
-        batch_result = processor.process_manual_batch()
-        
-        return jsonify({
-            'success': True,
-            'message': f'Processed {batch_result["emails_processed"]} emails for {account_email}',
-            'data': batch_result
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to process batch for account {account_email}: {e}")
-        return jsonify({
+    # Parse request data
+    data = request_json()
+    limit = data.get('limit', 100)
+    
+    # Validate limit
+    if not isinstance(limit, int) or limit < 1 or limit > 500:
+        return json_response({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'Limit must be an integer between 1 and 500'
+        }, status=400)
+    
+    # Get the processor for this account
+    task_manager = g.task_manager
+    processor = task_manager._get_processor(account_email)
+    
+    if not processor:
+        return account_not_found(account_email)
+    
+    # Check if account is in startup mode (read straight off the processor
+    # instead of building its full status)
+    if processor.mode != ProcessingMode.STARTUP:
+        return json_response({
+            'success': False,
+            'error': f'Batch processing only available in startup mode. Account is in {processor.mode.value} mode.'
+        }, status=400)
+    
+    # Use the new manual processing method that includes all rule types
+    batch_result = processor.process_manual_batch()
+    
+    return json_response({
+        'success': True,
+        'message': f'Processed {batch_result["emails_processed"]} emails for {account_email}',
+        'data': batch_result
+    })
 
 
 @services_bp.route('/accounts/<account_email>/inbox-count', methods=['GET'])
+@api_error
 def get_inbox_count(account_email: str):
     """
     Get current inbox count for an account
@@ -687,61 +732,105 @@ def get_inbox_count(account_email: str):
     Returns:
         JSON: Current inbox count
     """
-    try:
-        # Get the processor for this account
-        task_manager = get_task_manager()
+    # Get the processor for this account
+    task_manager = g.task_manager
+    processor = task_manager._get_processor(account_email)
+    
+    if not processor:
+        return account_not_found(account_email)
+    
+    inbox_count = inbox_message_count(processor)
+    
+    return json_response({
+        'success': True,
+        'data': {
+            'account_email': account_email,
+            'inbox_count': inbox_count
+        }
+    })
+
+
+@services_bp.route('/status/full', methods=['GET'])
+@api_error
+def get_full_status():
+    """
+    Get system status, aggregate stats and inbox counts in one response
+    
+    Lets the UI refresh everything with a single request instead of one
+    per endpoint and account. Inbox counts are fetched concurrently on
+    the inbox pool while the status and stats are collected; accounts
+    whose count isn't in by INBOX_COUNT_TIMEOUT are reported as None.
+    
+    Returns:
+        JSON: {'system': ..., 'stats': ..., 'inbox': {email: count or None}}
+    """
+    task_manager = g.task_manager
+    inbox_futures = {}
+    for account_email in task_manager.account_emails():
         processor = task_manager._get_processor(account_email)
-        
-        if not processor:
-            return jsonify({
-                'success': False,
-                'error': f'Account {account_email} not found'
-            }), 404
-        
-        # Get inbox count
+        if processor:
+            inbox_futures[account_email] = _inbox_pool.submit(inbox_message_count, processor)
+    
+    system_status = task_manager.get_all_status()
+    stats = task_manager.get_aggregate_stats()
+    
+    # One deadline for all accounts
+    done, _ = wait(inbox_futures.values(), timeout=INBOX_COUNT_TIMEOUT)
+    
+    inbox = {}
+    for account_email, future in inbox_futures.items():
+        if future in done:
+            inbox[account_email] = future.result()
+        else:
+            # Drop it from the queue if it hasn't started yet
+            future.cancel()
+            logger.warning(f"Timed out getting inbox count for {account_email}")
+            inbox[account_email] = None
+    
+    return json_response({
+        'success': True,
+        'data': {
+            'system': system_status,
+            'stats': stats,
+            'inbox': inbox
+        }
+    })
+
+
+def inbox_message_count(processor):
+    """
+    Get the number of messages in an account's inbox
+    
+    Uses IMAP STATUS, so no messages are fetched. Returns 0 if the count
+    can't be retrieved.
+    """
+    try:
+        mb = processor.account.login()
         try:
-            mb = processor.account.login()
-            inbox_count = len(list(mb.fetch('ALL')))
-        except Exception as e:
-            logger.warning(f"Could not get inbox count for {account_email}: {e}")
-            inbox_count = 0
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'account_email': account_email,
-                'inbox_count': inbox_count
-            }
-        })
-        
+            return mb.folder.status('INBOX', ['MESSAGES'])['MESSAGES']
+        finally:
+            mb.logout()
     except Exception as e:
-        logger.error(f"Failed to get inbox count for account {account_email}: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+        logger.warning(f"Could not get inbox count for {processor.account_config.email}: {e}")
+        return 0
 
 
 # Error handlers
 @services_bp.errorhandler(400)
 def bad_request(error):
-    return jsonify({
-        'success': False,
-        'error': 'Bad request'
-    }), 400
+    return error_response(400)
 
 
 @services_bp.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        'success': False,
-        'error': 'Not found'
-    }), 404
+    return error_response(404)
+
+
+@services_bp.errorhandler(415)
+def unsupported_media_type(error):
+    return error_response(415)
 
 
 @services_bp.errorhandler(500)
 def internal_error(error):
-    return jsonify({
-        'success': False,
-        'error': 'Internal server error'
-    }), 500
\ No newline at end of file
+    return error_response(500)